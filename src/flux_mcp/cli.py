@@ -1,36 +1,162 @@
 """CLI tool for FLUX image generation."""
 
+import gc
 import logging
+import os
+import shutil
 import sys
 from pathlib import Path
 
 import click
-import torch
-from PIL import Image
 from rich.console import Console
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.table import Table
 
 from .config import config
-from .generator import FluxGenerator
 
 console = Console()
 
-# Disable noisy logging for CLI
-logging.getLogger("diffusers").setLevel(logging.WARNING)
-logging.getLogger("transformers").setLevel(logging.WARNING)
+# Let the CUDA caching allocator grow segments instead of reserving fixed blocks;
+# FLUX's varying activation shapes otherwise fragment VRAM in long sessions.
+# The allocator reads this on first CUDA initialization, not on torch import.
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
+
+
+_DIM_MIN = 256
+_DIM_MAX = 2048
+_DIM_STEP = 8
+
+# Resolution scale factor and retry budget for out-of-memory recovery
+_OOM_SIZE_FACTOR = 0.75
+_OOM_MAX_RETRIES = 1
+
+
+def _validate_dim(value):
+    """Return an error message if a dimension is invalid, otherwise None."""
+    if value % _DIM_STEP != 0:
+        return f"must be a multiple of {_DIM_STEP}"
+    if value < _DIM_MIN or value > _DIM_MAX:
+        return f"must be between {_DIM_MIN} and {_DIM_MAX}"
+    return None
 
 
 def validate_dimensions(ctx, param, value):
     """Validate that dimensions are multiples of 8."""
-    if value % 8 != 0:
-        raise click.BadParameter("must be a multiple of 8")
-    if value < 256 or value > 2048:
-        raise click.BadParameter("must be between 256 and 2048")
+    error = _validate_dim(value)
+    if error:
+        raise click.BadParameter(error)
     return value
 
 
+def _configure_logging(verbose):
+    """Set the root log level, adding a handler only if none is configured yet.
+
+    basicConfig() is a no-op once the root logger has handlers, which would
+    silently ignore --verbose, so the level is always set explicitly.
+    """
+    root = logging.getLogger()
+    if not root.handlers:
+        logging.basicConfig()
+    root.setLevel(logging.DEBUG if verbose else logging.ERROR)
+
+
+def _parse_gen_params(inputs):
+    """Parse raw interactive-mode strings into generation parameters.
+
+    Args:
+        inputs: Dict with "steps", "guidance", "width", "height" and "seed" strings
+                (empty string means use the default)
+
+    Returns:
+        Tuple of (steps, guidance, width, height, seed)
+
+    Raises:
+        ValueError: If a value cannot be parsed or a dimension is out of range
+    """
+    steps = int(inputs["steps"]) if inputs["steps"] else 50
+    guidance = float(inputs["guidance"]) if inputs["guidance"] else 4.0
+    width = int(inputs["width"]) if inputs["width"] else 1024
+    height = int(inputs["height"]) if inputs["height"] else 1024
+    seed = int(inputs["seed"]) if inputs["seed"] else None
+
+    for name, value in (("width", width), ("height", height)):
+        error = _validate_dim(value)
+        if error:
+            raise ValueError(f"{name} {error}")
+
+    return steps, guidance, width, height, seed
+
+
+def _apply_options(f, options):
+    """Apply a list of click options to f, preserving their listed order in --help."""
+    for option in reversed(options):
+        f = option(f)
+    return f
+
+
+def _gen_options(f):
+    """Generation parameters shared by the generate and batch commands."""
+    return _apply_options(
+        f,
+        [
+            click.option(
+                "--steps",
+                "-s",
+                default=None,
+                type=int,
+                help=f"Number of inference steps (default: {config.default_steps} from config)",
+            ),
+            click.option(
+                "--guidance",
+                "-g",
+                default=None,
+                type=float,
+                help=f"Guidance scale (default: {config.default_guidance} from config)",
+            ),
+            click.option(
+                "--width",
+                "-w",
+                default=1024,
+                type=int,
+                callback=validate_dimensions,
+                help="Image width in pixels (must be multiple of 8)",
+            ),
+            click.option(
+                "--height",
+                "-h",
+                default=1024,
+                type=int,
+                callback=validate_dimensions,
+                help="Image height in pixels (must be multiple of 8)",
+            ),
+        ],
+    )
+
+
+def _run_options(f):
+    """Output and runtime options shared by the generate and batch commands."""
+    return _apply_options(
+        f,
+        [
+            click.option(
+                "--output-dir",
+                type=click.Path(path_type=Path),
+                help="Override output directory",
+            ),
+            click.option(
+                "--verbose",
+                "-v",
+                is_flag=True,
+                help="Verbose output with debug info",
+            ),
+            click.option(
+                "--fast",
+                "-f",
+                is_flag=True,
+                help="Use FLUX.1-dev for faster generation (~4-8 min vs ~30-40 min)",
+            ),
+        ],
+    )
+
+
 @click.group()
 @click.version_option(version="1.0.0", prog_name="flux")
 def cli():
@@ -40,36 +166,7 @@ def cli():
 
 @cli.command()
 @click.argument("prompt", required=False)
-@click.option(
-    "--steps",
-    "-s",
-    default=None,
-    type=int,
-    help=f"Number of inference steps (default: {config.default_steps} from config)",
-)
-@click.option(
-    "--guidance",
-    "-g",
-    default=None,
-    type=float,
-    help=f"Guidance scale (default: {config.default_guidance} from config)",
-)
-@click.option(
-    "--width",
-    "-w",
-    default=1024,
-    type=int,
-    callback=validate_dimensions,
-    help="Image width in pixels (must be multiple of 8)",
-)
-@click.option(
-    "--height",
-    "-h",
-    default=1024,
-    type=int,
-    callback=validate_dimensions,
-    help="Image height in pixels (must be multiple of 8)",
-)
+@_gen_options
 @click.option(
     "--seed",
     type=int,
@@ -78,32 +175,16 @@ def cli():
 @click.option(
     "--output",
     "-o",
-    type=click.Path(),
+    type=click.Path(path_type=Path),
     help="Custom output path (default: auto-generated)",
 )
-@click.option(
-    "--output-dir",
-    type=click.Path(),
-    help="Override output directory",
-)
 @click.option(
     "--interactive",
     "-i",
     is_flag=True,
     help="Interactive mode with prompts",
 )
-@click.option(
-    "--verbose",
-    "-v",
-    is_flag=True,
-    help="Verbose output with debug info",
-)
-@click.option(
-    "--fast",
-    "-f",
-    is_flag=True,
-    help="Use FLUX.1-dev for faster generation (~4-8 min vs ~30-40 min)",
-)
+@_run_options
 def generate(
     prompt, steps, guidance, width, height, seed, output, output_dir, interactive, verbose, fast
 ):
@@ -120,15 +201,24 @@ def generate(
         flux generate --interactive
     """
     # Set logging level
-    if verbose:
-        logging.basicConfig(level=logging.DEBUG)
-    else:
-        logging.basicConfig(level=logging.ERROR)
+    _configure_logging(verbose)
 
     # Override output directory if specified
     if output_dir:
-        config.output_dir = Path(output_dir)
-        config.output_dir.mkdir(parents=True, exist_ok=True)
+        config.output_dir = output_dir
+
+    # Validate prompt before pulling in torch/diffusers
+    if not interactive and not prompt:
+        console.print("[red]✗ Error: Prompt is required[/red]")
+        console.print('\nUsage: flux generate "your prompt here"')
+        console.print("   or: flux generate --interactive")
+        sys.exit(1)
+
+    import torch
+
+    # Disable noisy logging for CLI
+    logging.getLogger("diffusers").setLevel(logging.WARNING)
+    logging.getLogger("transformers").setLevel(logging.WARNING)
 
     if torch.cuda.is_available():
         is_rocm = hasattr(torch.version, "hip") and torch.version.hip is not None
@@ -144,13 +234,6 @@ def generate(
         _interactive_mode()
         return
 
-    # Validate prompt
-    if not prompt:
-        console.print("[red]✗ Error: Prompt is required[/red]")
-        console.print('\nUsage: flux generate "your prompt here"')
-        console.print("   or: flux generate --interactive")
-        sys.exit(1)
-
     # Determine model based on --fast flag
     model = "flux1-dev" if fast else None  # None uses default from config
 
@@ -168,19 +251,141 @@ def generate(
     )
 
 
+@cli.command()
+@click.argument("prompts_file", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@_gen_options
+@click.option(
+    "--count",
+    "-n",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Number of images to generate per prompt (random seed each)",
+)
+@_run_options
+def batch(prompts_file, steps, guidance, width, height, count, output_dir, verbose, fast):
+    """Generate images for every prompt in a file, loading the model once.
+
+    PROMPTS_FILE contains one prompt per line; blank lines are skipped.
+
+    Examples:
+
+        flux batch prompts.txt
+
+        flux batch prompts.txt --count 4 --fast
+    """
+    _configure_logging(verbose)
+
+    if output_dir:
+        config.output_dir = output_dir
+
+    prompts = [line.strip() for line in prompts_file.read_text().splitlines()]
+    prompts = [p for p in prompts if p]
+    if not prompts:
+        console.print(f"[red]✗ Error: No prompts found in {prompts_file}[/red]")
+        sys.exit(1)
+
+    import torch
+
+    from .generator import FluxGenerator
+
+    logging.getLogger("diffusers").setLevel(logging.WARNING)
+    logging.getLogger("transformers").setLevel(logging.WARNING)
+
+    if torch.cuda.is_available():
+        torch.backends.cudnn.benchmark = True
+
+    model = "flux1-dev" if fast else None  # None uses default from config
+
+    # One generator for the whole batch so the model is loaded only once
+    generator = FluxGenerator(auto_unload=False)
+    total = len(prompts) * count
+    done = 0
+    failed = 0
+    with torch.inference_mode():
+        for prompt in prompts:
+            for _ in range(count):
+                done += 1
+                console.print(f"\n[bold]({done}/{total})[/bold] {prompt}")
+                # A failing prompt is reported and skipped instead of ending the batch
+                succeeded = _generate_image(
+                    prompt=prompt,
+                    steps=steps,
+                    guidance=guidance,
+                    width=width,
+                    height=height,
+                    seed=None,
+                    output_path=None,
+                    verbose=verbose,
+                    model=model,
+                    generator=generator,
+                    exit_on_error=False,
+                )
+                if not succeeded:
+                    failed += 1
+
+    if failed:
+        console.print(
+            f"\n[bold red]✗ Batch finished with errors: {total - failed} of {total} "
+            f"image(s) generated, {failed} failed[/bold red]"
+        )
+        sys.exit(1)
+    console.print(f"\n[bold green]✓ Batch complete: {total} image(s) generated[/bold green]")
+
+
+def _failed(exit_on_error):
+    """Exit with status 1, or return False for callers that carry on after an error."""
+    if exit_on_error:
+        sys.exit(1)
+    return False
+
+
 def _generate_image(
-    prompt, steps, guidance, width, height, seed, output_path, verbose, model=None, generator=None
+    prompt,
+    steps,
+    guidance,
+    width,
+    height,
+    seed,
+    output_path,
+    verbose,
+    model=None,
+    generator=None,
+    exit_on_error=True,
 ):
-    """Internal function to generate a single image."""
+    """Internal function to generate a single image.
+
+    Returns True on success. On error it exits with status 1, or returns False
+    when ``exit_on_error`` is off.
+    """
+    import torch
+    from rich.progress import (
+        BarColumn,
+        MofNCompleteColumn,
+        Progress,
+        TextColumn,
+        TimeRemainingColumn,
+    )
+
+    from .generator import FluxGenerator, _make_thumbnail, _thumbnail_path
+
     # Create generator if not provided (for single-shot mode)
     if generator is None:
         generator = FluxGenerator(auto_unload=False)
 
+    # Write straight to the custom path instead of renaming afterwards, which
+    # degrades to a full copy when the target is on another filesystem.
+    # Checked before the model loads so strict mode fails fast.
+    try:
+        config.ensure_output_dir(output_path.parent if output_path else None)
+    except FileNotFoundError as e:
+        console.print(f"[red]✗ Error: {e}[/red]")
+        return _failed(exit_on_error)
+
     try:
         # Load model with progress indicator
         if generator.pipeline is None:
             with console.status("[bold green]Loading FLUX model...", spinner="dots"):
-                generator._load_model()
+                generator._load_model(config.models.get(model, model) if model else None)
             console.print("✓ Model loaded\n")
 
         # Generate image with progress
@@ -189,45 +394,84 @@ def _generate_image(
             console.print(f"  Prompt: {prompt}")
             console.print(f"  Steps: {steps}, Guidance: {guidance}")
             console.print(f"  Resolution: {width}x{height}")
-            if seed:
+            if seed is not None:
                 console.print(f"  Seed: {seed}")
 
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-            transient=True,
-        ) as progress:
-            _task = progress.add_task("Generating...", total=None)
-
-            # Generate
-            result_path, used_seed, settings, pil_image, _image_id = generator.generate(
-                prompt=prompt,
-                steps=steps,
-                guidance_scale=guidance,
-                width=width,
-                height=height,
-                seed=seed,
-                model=model,
-            )
-
-        # Handle custom output path
-        if output_path:
-            output_path = Path(output_path)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            result_path.rename(output_path)
-            result_path = output_path
+        # On OOM, free the cache and retry once at reduced resolution rather than
+        # exiting, which would force a full model reload on the next run
+        oom_retries = 0
+        while True:
+            out_of_memory = False
+            try:
+                if verbose:
+                    # Redraw only when the pipeline reports a finished denoising step instead
+                    # of polling at a fixed refresh rate for the whole (GPU-bound) generation
+                    progress = Progress(
+                        TextColumn("[progress.description]{task.description}"),
+                        BarColumn(),
+                        MofNCompleteColumn(),
+                        TimeRemainingColumn(),
+                        console=console,
+                        transient=True,
+                        auto_refresh=False,
+                    )
+                    task = progress.add_task("Generating...", total=steps)
+
+                    def on_step(current_step, total_steps, progress=progress, task=task):
+                        progress.update(
+                            task, completed=current_step, total=total_steps, refresh=True
+                        )
+
+                    display = progress
+                else:
+                    # A single status spinner keeps no frame history to erase at teardown
+                    on_step = None
+                    display = console.status("[bold cyan]Generating...", spinner="dots")
+
+                with display:
+                    # Generate
+                    result_path, used_seed, settings, pil_image, _image_id = generator.generate(
+                        prompt=prompt,
+                        steps=steps,
+                        guidance_scale=guidance,
+                        width=width,
+                        height=height,
+                        seed=seed,
+                        model=model,
+                        progress_callback=on_step,
+                        output_path=output_path,
+                    )
+                break
+            except torch.cuda.OutOfMemoryError:
+                new_width = max(_DIM_MIN, int(width * _OOM_SIZE_FACTOR) // _DIM_STEP * _DIM_STEP)
+                new_height = max(_DIM_MIN, int(height * _OOM_SIZE_FACTOR) // _DIM_STEP * _DIM_STEP)
+                if oom_retries >= _OOM_MAX_RETRIES or (new_width, new_height) == (width, height):
+                    raise
+                # Only flag it here: until the except block exits, the traceback keeps the
+                # failed attempt's frames (and their activations) alive
+                out_of_memory = True
+
+            if out_of_memory:
+                oom_retries += 1
+                gc.collect()
+                torch.cuda.empty_cache()
+                console.print(
+                    f"[yellow]⚠ Out of memory at {width}x{height}, "
+                    f"retrying at {new_width}x{new_height}[/yellow]"
+                )
+                width, height = new_width, new_height
 
         # Create thumbnail (512x512) for preview
-        thumbnail_size = (512, 512)
-        thumbnail = pil_image.copy()
-        thumbnail.thumbnail(thumbnail_size, Image.Resampling.LANCZOS)
+        thumbnail = _make_thumbnail(pil_image)
 
         # Save thumbnail to disk
-        thumb_filename = result_path.stem + "_thumb" + result_path.suffix
-        thumb_path = result_path.parent / thumb_filename
+        thumb_path = _thumbnail_path(result_path)
         thumbnail.save(thumb_path)
 
+        # The full-size PNG is written in the background; surface any write error
+        # (full disk, permissions) before reporting success
+        generator.wait_for_save(result_path)
+
         # Success output
         console.print("\n[bold green]✓ Image generated successfully![/bold green]\n")
         console.print(f"  📁 Image: {result_path}")
@@ -237,26 +481,31 @@ def _generate_image(
 
         if not verbose:
             console.print(f"\n[dim]Tip: Use --seed {used_seed} to reproduce this image[/dim]")
+        return True
 
     except (torch.cuda.OutOfMemoryError, RuntimeError) as e:
         if "out of memory" in str(e).lower():
             console.print("\n[red]✗ Out of memory![/red]")
             console.print("\nTry reducing resolution:")
             console.print(f"  flux generate '{prompt}' --width 768 --height 768")
-            sys.exit(1)
+            return _failed(exit_on_error)
         console.print(f"\n[red]✗ Error: {e}[/red]")
         if verbose:
             console.print_exception()
-        sys.exit(1)
+        return _failed(exit_on_error)
     except Exception as e:
         console.print(f"\n[red]✗ Error: {e}[/red]")
         if verbose:
             console.print_exception()
-        sys.exit(1)
+        return _failed(exit_on_error)
 
 
 def _interactive_mode():
     """Interactive mode for batch generation."""
+    from rich.panel import Panel
+
+    from .generator import FluxGenerator
+
     console.print(
         Panel.fit(
             "🎨 [bold cyan]FLUX Image Generator[/bold cyan] - Interactive Mode\n"
@@ -282,31 +531,15 @@ def _interactive_mode():
             continue
 
         # Get parameters with defaults
+        inputs = {
+            "steps": console.input("[bold]Steps[/bold] [dim][50][/dim]: ").strip(),
+            "guidance": console.input("[bold]Guidance scale[/bold] [dim][4.0][/dim]: ").strip(),
+            "width": console.input("[bold]Width[/bold] [dim][1024][/dim]: ").strip(),
+            "height": console.input("[bold]Height[/bold] [dim][1024][/dim]: ").strip(),
+            "seed": console.input("[bold]Seed[/bold] [dim](random if empty)[/dim]: ").strip(),
+        }
         try:
-            steps_input = console.input("[bold]Steps[/bold] [dim][50][/dim]: ").strip()
-            steps = int(steps_input) if steps_input else 50
-
-            guidance_input = console.input("[bold]Guidance scale[/bold] [dim][4.0][/dim]: ").strip()
-            guidance = float(guidance_input) if guidance_input else 4.0
-
-            width_input = console.input("[bold]Width[/bold] [dim][1024][/dim]: ").strip()
-            width = int(width_input) if width_input else 1024
-
-            height_input = console.input("[bold]Height[/bold] [dim][1024][/dim]: ").strip()
-            height = int(height_input) if height_input else 1024
-
-            seed_input = console.input("[bold]Seed[/bold] [dim](random if empty)[/dim]: ").strip()
-            seed = int(seed_input) if seed_input else None
-
-            # Validate dimensions
-            if width % 8 != 0 or height % 8 != 0:
-                console.print("[red]✗ Width and height must be multiples of 8[/red]")
-                continue
-
-            if width < 256 or width > 2048 or height < 256 or height > 2048:
-                console.print("[red]✗ Dimensions must be between 256 and 2048[/red]")
-                continue
-
+            steps, guidance, width, height, seed = _parse_gen_params(inputs)
         except ValueError as e:
             console.print(f"[red]✗ Invalid input: {e}[/red]")
             continue
@@ -337,43 +570,52 @@ def _interactive_mode():
 @cli.command()
 def status():
     """Show FLUX generator status and system information."""
-    table = Table(title="FLUX Generator Status", show_header=True, header_style="bold cyan")
-    table.add_column("Setting", style="cyan")
-    table.add_column("Value", style="white")
+    import torch
+    from rich.table import Table
 
     # Model info
-    table.add_row("Model", config.model_id)
-    table.add_row("Output Directory", str(config.output_dir))
+    rows = [
+        ("Model", config.model_id),
+        ("Output Directory", str(config.output_dir)),
+    ]
 
     if torch.cuda.is_available():
-        gpu_name = torch.cuda.get_device_name(0)
-        vram_total = torch.cuda.get_device_properties(0).total_memory / (1024**3)
+        props = torch.cuda.get_device_properties(0)
+        vram_total = props.total_memory / (1024**3)
         vram_allocated = torch.cuda.memory_allocated() / (1024**3)
         vram_reserved = torch.cuda.memory_reserved() / (1024**3)
 
         is_rocm = hasattr(torch.version, "hip") and torch.version.hip is not None
         backend_label = f"ROCm {torch.version.hip}" if is_rocm else "CUDA"
-        table.add_row("Device", backend_label)
-        table.add_row("GPU", gpu_name)
-        table.add_row("Total VRAM", f"{vram_total:.2f} GB")
-        table.add_row("Allocated VRAM", f"{vram_allocated:.2f} GB")
-        table.add_row("Reserved VRAM", f"{vram_reserved:.2f} GB")
+        rows += [
+            ("Device", backend_label),
+            ("GPU", props.name),
+            ("Total VRAM", f"{vram_total:.2f} GB"),
+            ("Allocated VRAM", f"{vram_allocated:.2f} GB"),
+            ("Reserved VRAM", f"{vram_reserved:.2f} GB"),
+        ]
     elif torch.backends.mps.is_available():
         from .generator import _get_available_memory_gb
 
-        table.add_row("Device", "MPS (Apple Silicon)")
-        table.add_row("Available RAM", f"{_get_available_memory_gb():.2f} GB")
+        rows += [
+            ("Device", "MPS (Apple Silicon)"),
+            ("Available RAM", f"{_get_available_memory_gb():.2f} GB"),
+        ]
     else:
-        table.add_row("Device", "[yellow]CPU (no GPU detected)[/yellow]")
+        rows.append(("Device", "[yellow]CPU (no GPU detected)[/yellow]"))
 
     # Cache info
     if config.model_cache:
-        table.add_row("Model Cache", str(config.model_cache))
+        rows.append(("Model Cache", str(config.model_cache)))
     else:
-        from pathlib import Path
-
         default_cache = Path.home() / ".cache" / "huggingface" / "hub"
-        table.add_row("Model Cache", f"{default_cache} [dim](default)[/dim]")
+        rows.append(("Model Cache", f"{default_cache} [dim](default)[/dim]"))
+
+    table = Table(title="FLUX Generator Status", show_header=True, header_style="bold cyan")
+    table.add_column("Setting", style="cyan")
+    table.add_column("Value", style="white")
+    for setting, value in rows:
+        table.add_row(setting, value)
 
     console.print(table)
 
@@ -381,16 +623,21 @@ def status():
 @cli.command()
 def config_cmd():
     """Show current configuration."""
+    from rich.table import Table
+
+    rows = [
+        ("FLUX_OUTPUT_DIR", str(config.output_dir)),
+        ("FLUX_MODEL", config.model_id),
+        ("FLUX_UNLOAD_TIMEOUT", f"{config.unload_timeout}s [dim](MCP only)[/dim]"),
+    ]
+    if config.model_cache:
+        rows.append(("FLUX_MODEL_CACHE", str(config.model_cache)))
+
     table = Table(title="FLUX Configuration", show_header=True, header_style="bold cyan")
     table.add_column("Variable", style="cyan")
     table.add_column("Value", style="white")
-
-    table.add_row("FLUX_OUTPUT_DIR", str(config.output_dir))
-    table.add_row("FLUX_MODEL", config.model_id)
-    table.add_row("FLUX_UNLOAD_TIMEOUT", f"{config.unload_timeout}s [dim](MCP only)[/dim]")
-
-    if config.model_cache:
-        table.add_row("FLUX_MODEL_CACHE", str(config.model_cache))
+    for variable, value in rows:
+        table.add_row(variable, value)
 
     console.print(table)
     console.print("\n[dim]Config file: ~/.config/flux-mcp/.env (if exists)[/dim]")
@@ -409,25 +656,19 @@ def open_output():
         console.print("[dim]It will be created when you generate your first image.[/dim]")
         return
 
-    try:
-        # Linux
-        subprocess.run(["xdg-open", str(output_dir)], check=True)
-        console.print(f"✓ Opened {output_dir}")
-    except FileNotFoundError:
-        # macOS
-        try:
-            subprocess.run(["open", str(output_dir)], check=True)
-            console.print(f"✓ Opened {output_dir}")
-        except FileNotFoundError:
-            # Windows
+    # Linux, macOS, Windows
+    for opener in ("xdg-open", "open", "explorer"):
+        if shutil.which(opener):
             try:
-                subprocess.run(["explorer", str(output_dir)], check=True)
-                console.print(f"✓ Opened {output_dir}")
-            except FileNotFoundError:
-                console.print("[red]✗ Could not open file manager[/red]")
-                console.print(f"\nOutput directory: {output_dir}")
-    except subprocess.CalledProcessError as e:
-        console.print(f"[red]✗ Error opening directory: {e}[/red]")
+                subprocess.Popen([opener, str(output_dir)], start_new_session=True)
+            except OSError as e:
+                console.print(f"[red]✗ Error opening directory: {e}[/red]")
+                return
+            console.print(f"✓ Opened {output_dir}")
+            return
+
+    console.print("[red]✗ Could not open file manager[/red]")
+    console.print(f"\nOutput directory: {output_dir}")
 
 
 def main():
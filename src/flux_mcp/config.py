@@ -1,14 +1,16 @@
 """Configuration management for FLUX MCP Server."""
 
 import os
+import sys
 from pathlib import Path
 
-import torch
 from dotenv import load_dotenv
 
 # Load environment variables from .env file if it exists
 load_dotenv()
 
+__all__ = ["Config", "config"]
+
 
 class Config:
     """Configuration class for FLUX MCP Server."""
@@ -22,13 +24,18 @@ class Config:
         output_dir = os.getenv("FLUX_OUTPUT_DIR", str(Path.home() / "flux_output"))
         self.output_dir: Path = Path(output_dir).expanduser()
 
+        # Never create directories (output dir, --output parents); fail instead
+        self.strict_no_mkdir: bool = os.getenv("FLUX_STRICT_NO_MKDIR", "0") == "1"
+
         # HuggingFace model cache directory (optional)
         cache_dir = os.getenv("FLUX_MODEL_CACHE")
         self.model_cache: Path | None = Path(cache_dir).expanduser() if cache_dir else None
 
         # On MPS (Apple Silicon) default to FLUX.1-dev — FLUX.2-dev exceeds typical unified memory.
         # On CUDA/ROCm default to FLUX.2-dev for maximum quality.
-        _mps = not torch.cuda.is_available() and torch.backends.mps.is_available()
+        # macOS has no CUDA, so the platform check stands in for torch's MPS probe and
+        # keeps torch out of short CLI commands (help, config, open-output).
+        _mps = sys.platform == "darwin"
         _default_model = "black-forest-labs/FLUX.1-dev" if _mps else "black-forest-labs/FLUX.2-dev"
         self.model_id: str = os.getenv("FLUX_MODEL_ID", _default_model)
 
@@ -44,11 +51,72 @@ class Config:
             "black-forest-labs/FLUX.2-dev": {"steps": 50, "guidance": 7.5},
         }
 
+        # Compile the transformer with torch.compile on full-GPU CUDA loads (opt-in:
+        # compiling adds minutes to the first load but speeds up every step after)
+        self.compile_transformer: bool = os.getenv("FLUX_COMPILE", "0") == "1"
+
+        # Use block-level group offloading with CUDA streams instead of sequential
+        # CPU offload on 10-20GB GPUs (opt-in: faster, but less battle-tested)
+        self.group_offload: bool = os.getenv("FLUX_GROUP_OFFLOAD", "0") == "1"
+
+        # Page-lock CPU weights used by sequential offload so host-to-device copies are
+        # faster (opt-in: pins the full model size in host RAM)
+        self.pin_offload_memory: bool = os.getenv("FLUX_PIN_OFFLOAD_MEMORY", "0") == "1"
+
+        # Transformer weight format: "bf16" (default), "fp8" (Hopper+, torchao),
+        # "int8" (torchao) or "int4" (bitsandbytes)
+        self.quantization: str = os.getenv("FLUX_QUANTIZATION", "bf16").lower()
+        if self.quantization not in ("bf16", "fp8", "int8", "int4"):
+            raise ValueError(
+                f"FLUX_QUANTIZATION must be one of bf16, fp8, int8, int4 (got {self.quantization!r})"
+            )
+
+        # Run a full gc.collect() on every unload (model switches always collect)
+        self.aggressive_gc: bool = os.getenv("FLUX_AGGRESSIVE_GC", "0") == "1"
+
+        # Tile the VAE decode for images larger than this many pixels (width * height)
+        self.vae_tiling_threshold: int = int(
+            os.getenv("FLUX_VAE_TILING_THRESHOLD", str(1024 * 1024))
+        )
+
+        # Downscale preview thumbnails with LANCZOS instead of the faster BILINEAR/BOX
+        self.high_quality_preview: bool = os.getenv("FLUX_HIGH_QUALITY_PREVIEW", "0") == "1"
+
+        # Return MCP previews as a file:// resource link instead of inline base64 PNG
+        # (smaller responses; the client must be able to read the output directory)
+        self.preview_as_link: bool = os.getenv("FLUX_PREVIEW_AS_LINK", "0") == "1"
+
+        # Coalesce generate requests that arrive within this window into one batched
+        # pipeline call (0 disables batching); batches hold at most max_batch_size images
+        self.batch_window_ms: int = int(os.getenv("FLUX_BATCH_WINDOW_MS", "0"))
+        self.max_batch_size: int = int(os.getenv("FLUX_MAX_BATCH_SIZE", "4"))
+
         self.default_steps: int = int(os.getenv("FLUX_DEFAULT_STEPS", "40" if _mps else "50"))
         self.default_guidance: float = float(os.getenv("FLUX_DEFAULT_GUIDANCE", "7.5"))
 
-        # Ensure output directory exists
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+    def ensure_output_dir(self, directory: Path | None = None) -> None:
+        """Create the output directory if it does not exist yet.
+
+        Called only on the generation path so that read-only commands
+        (help, status, config) never touch the filesystem. Generation calls it
+        before running the pipeline, so strict mode fails fast.
+
+        Args:
+            directory: Directory to check (default: the configured output directory),
+                       e.g. the parent of a custom output path
+
+        Raises:
+            FileNotFoundError: If FLUX_STRICT_NO_MKDIR=1 and the directory is missing
+        """
+        directory = directory or self.output_dir
+        if self.strict_no_mkdir:
+            if not directory.is_dir():
+                raise FileNotFoundError(
+                    f"Output directory does not exist: {directory} "
+                    "(FLUX_STRICT_NO_MKDIR=1 prevents creating it)"
+                )
+            return
+        directory.mkdir(parents=True, exist_ok=True)
 
     def update_timeout(self, timeout_seconds: int) -> None:
         """Update the unload timeout.
@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
+import contextlib
 import gc
 import logging
+import os
+import secrets
 import threading
 import time
+from collections import OrderedDict
 from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 
@@ -14,11 +20,18 @@ import torch
 from diffusers import Flux2Pipeline, FluxPipeline
 from PIL import Image
 from PIL.PngImagePlugin import PngInfo
+from torch.nn.attention import SDPBackend, sdpa_kernel
 
 from .config import config
 
 logger = logging.getLogger(__name__)
 
+# How often the idle monitor checks whether the auto-unload timeout has passed
+_UNLOAD_POLL_SECONDS = 5.0
+
+# Number of prompts whose text-encoder outputs are kept for reuse
+_PROMPT_CACHE_SIZE = 32
+
 
 def _get_available_memory_gb() -> float:
     """Return available system RAM in GB (proxy for MPS unified memory)."""
@@ -30,6 +43,77 @@ def _get_available_memory_gb() -> float:
         return 32.0
 
 
+def _snap_dim(value: int) -> int:
+    """Round a dimension up to the next multiple of 64 (FLUX's patch stride)."""
+    return ((value + 63) // 64) * 64
+
+
+def _thumbnail_path(image_path: Path) -> Path:
+    """Return the preview thumbnail path that belongs to a full-size image."""
+    return image_path.with_name(f"{image_path.stem}_thumb{image_path.suffix}")
+
+
+def _make_thumbnail(pil_image: Image.Image, max_size: int = 512) -> Image.Image:
+    """Downscale an image to fit in ``max_size`` x ``max_size``, keeping its aspect ratio.
+
+    Resizes straight from the source instead of copy() + thumbnail(), so only the
+    destination is allocated; reducing_gap adds a cheap box prepass for large downscales.
+    Previews use BILINEAR (BOX from 4x down) unless FLUX_HIGH_QUALITY_PREVIEW=1 asks
+    for LANCZOS; the difference isn't visible at preview size.
+    """
+    scale = min(max_size / pil_image.width, max_size / pil_image.height, 1.0)
+    size = (max(1, round(pil_image.width * scale)), max(1, round(pil_image.height * scale)))
+    if config.high_quality_preview:
+        resample = Image.Resampling.LANCZOS
+    elif scale <= 0.25:
+        resample = Image.Resampling.BOX
+    else:
+        resample = Image.Resampling.BILINEAR
+    return pil_image.resize(size, resample, reducing_gap=2.0)
+
+
+def _save_png(pil_image: Image.Image, output_path: Path, png_info: PngInfo) -> None:
+    """Write a PNG atomically via a temp file so a crash never leaves a truncated image."""
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    # Fastest zlib level: ~3x quicker encode than the default for ~20% larger files
+    try:
+        pil_image.save(tmp_path, format="PNG", pnginfo=png_info, compress_level=1, optimize=False)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        # Don't leave a partial .tmp file behind (e.g. after a full disk)
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _log_save_error(future: Future) -> None:
+    """Done-callback that surfaces background save failures in the log."""
+    exc = future.exception()
+    if exc is not None:
+        logger.error(f"Failed to save image: {exc}")
+
+
+@dataclass(eq=False)
+class _GenerationRequest:
+    """A pending generate() call, possibly coalesced with others into one pipeline call."""
+
+    prompt: str
+    steps: int | None
+    guidance_scale: float | None
+    width: int
+    height: int
+    seed: int
+    model_id: str | None
+    progress_callback: Callable[[int, int], None] | None
+    done: bool = False
+    result: tuple | None = None  # (pil_image, metadata, generation_time, localtime)
+    error: BaseException | None = None
+
+    @property
+    def batch_key(self) -> tuple:
+        """Requests with equal keys can share a single pipeline call."""
+        return (self.model_id, self.steps, self.guidance_scale, self.width, self.height)
+
+
 class FluxGenerator:
     """FLUX image generator with lazy loading and auto-unload."""
 
@@ -44,12 +128,24 @@ class FluxGenerator:
         """
         self.pipeline: FluxPipeline | Flux2Pipeline | None = None
         self._lock = threading.Lock()
-        self._unload_timer: threading.Timer | None = None
+        self._monitor_thread: threading.Thread | None = None  # Idle auto-unload monitor
         self._last_access: datetime | None = None
         self.auto_unload = auto_unload
         self.model_id = model_id or config.model_id
         self._current_model_id: str | None = None  # Track which model is actually loaded
         self._last_image_id: str | None = None  # Track last generated image stem
+        self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="flux-io")
+        self._pending_saves: dict[Path, Future] = {}  # Background PNG writes by path
+        self._saves_lock = threading.Lock()
+        self._dtype = torch.bfloat16  # Compute dtype of the loaded pipeline
+        self._generator: torch.Generator | None = None  # RNG reused across generations
+        self._defaults: dict = {}  # Model-specific steps/guidance for the loaded model
+        self._batch_queue: list[_GenerationRequest] = []  # Requests awaiting coalescing
+        self._queue_lock = threading.Lock()
+        # (prompt, model_id) -> prompt embedding tensors, most recently used last
+        self._prompt_cache: OrderedDict[tuple[str, str], dict] = OrderedDict()
+        self._compiled = False  # Whether the loaded transformer is torch.compile'd
+        self._compiled_shapes: set[tuple[int, int, int]] = set()  # (width, height, batch)
         if torch.cuda.is_available():
             self._device = "cuda"
             # ROCm exposes itself via the CUDA API; detect it for accurate logging
@@ -77,7 +173,9 @@ class FluxGenerator:
         # If a different model is loaded, unload it first
         if self.pipeline is not None and self._current_model_id != target_model:
             logger.info(f"Switching from {self._current_model_id} to {target_model}")
-            self.unload_model()
+            # The caller holds self._lock (or owns the generator), so don't re-acquire it.
+            # Always collect here: the old weights must be gone before the new ones load.
+            self._unload_locked(collect=True)
         elif self.pipeline is not None:
             logger.debug(f"Model {target_model} already loaded")
             return
@@ -85,30 +183,57 @@ class FluxGenerator:
         logger.info(f"Loading FLUX model: {target_model}")
         start_time = time.time()
 
+        dtype = self._select_dtype(target_model)
+
         # Enable TF32 for faster matmul on Ampere+ NVIDIA GPUs (no-op on ROCm)
         if torch.cuda.is_available() and not self._is_rocm:
-            torch.backends.cuda.matmul.allow_tf32 = True
-            torch.backends.cudnn.allow_tf32 = True
-            logger.info("Enabled TF32 for faster matrix operations")
+            if torch.cuda.get_device_capability(0)[0] >= 8:
+                torch.backends.cuda.matmul.allow_tf32 = True
+                torch.backends.cudnn.allow_tf32 = True
+                logger.info("Enabled TF32 for faster matrix operations")
+            torch.backends.cudnn.benchmark = True
 
-        # Load the pipeline with bfloat16 for VRAM efficiency
         # Use the correct pipeline class based on the model
-        if "FLUX.1" in target_model:
-            pipeline_class = FluxPipeline
-            logger.info(f"Loading {target_model} with FluxPipeline (FLUX.1) and bfloat16 precision")
-        else:
+        dtype_name = str(dtype).removeprefix("torch.")
+        # (custom FLUX.1 fine-tunes and mirrors load with FluxPipeline too)
+        if "FLUX.2" in target_model:
             pipeline_class = Flux2Pipeline
-            logger.info(
-                f"Loading {target_model} with Flux2Pipeline (FLUX.2) and bfloat16 precision"
-            )
-
-        dtype = torch.float16 if self._device == "mps" else torch.bfloat16
+            logger.info(f"Loading {target_model} with Flux2Pipeline (FLUX.2) and {dtype_name}")
+        else:
+            pipeline_class = FluxPipeline
+            logger.info(f"Loading {target_model} with FluxPipeline (FLUX.1) and {dtype_name}")
+
+        # Set before building quantization kwargs, which use it as the compute dtype
+        self._dtype = dtype
+        torch_dtype = dtype
+        if dtype == torch.float16 and self._device == "cuda" and pipeline_class is FluxPipeline:
+            # CLIP/T5 activations overflow in float16, which changes the images; keep the
+            # FLUX.1 text encoders in float32 (embeddings are cast back in _encode_prompt).
+            torch_dtype = {
+                "default": dtype,
+                "text_encoder": torch.float32,
+                "text_encoder_2": torch.float32,
+            }
+            logger.info("Keeping FLUX.1 text encoders in float32 on the float16 path")
         self.pipeline = pipeline_class.from_pretrained(
             target_model,
-            torch_dtype=dtype,
+            torch_dtype=torch_dtype,
             cache_dir=config.model_cache,
+            **self._quantization_kwargs(),
         )
         self._current_model_id = target_model
+        # Output dir and unload timeout are read live: both can change at runtime
+        model_defaults = config.model_defaults.get(target_model, {})
+        self._defaults = {
+            "steps": model_defaults.get("steps", config.default_steps),
+            "guidance": model_defaults.get("guidance", config.default_guidance),
+        }
+        if config.quantization in ("fp8", "int8"):
+            self._quantize_transformer(config.quantization)
+
+        # Decode batch members one at a time to cap VAE peak memory (tiling is per call)
+        if hasattr(self.pipeline.vae, "enable_slicing"):
+            self.pipeline.vae.enable_slicing()
 
         # Apply memory optimization based on available VRAM
         if torch.cuda.is_available():
@@ -124,29 +249,52 @@ class FluxGenerator:
             if total_vram_gb >= 24:
                 logger.info("Using full GPU mode (24GB+ VRAM) - fastest")
                 self.pipeline.to("cuda")
+                # NHWC lets cuDNN use tensor-core conv kernels in the VAE; skipped on offload
+                # paths, where accelerate hooks fight layout conversion
+                self.pipeline.vae.to(memory_format=torch.channels_last)
+                # Only compile when fully resident; compile and CPU offload hooks interact badly
+                if config.compile_transformer:
+                    self._compile_transformer()
             elif total_vram_gb >= 20:
                 logger.info(f"Using model CPU offload ({total_vram_gb:.1f}GB VRAM) - balanced")
                 self.pipeline.enable_model_cpu_offload()
+            elif (
+                config.group_offload
+                and total_vram_gb >= 10
+                and hasattr(self.pipeline, "enable_group_offload")
+            ):
+                # Overlaps host<->device weight copies with compute on a side stream
+                logger.info(
+                    f"Using group offload with CUDA streams ({total_vram_gb:.1f}GB VRAM) - balanced"
+                )
+                self.pipeline.enable_group_offload(
+                    onload_device=torch.device("cuda"),
+                    offload_device=torch.device("cpu"),
+                    offload_type="block_level",
+                    num_blocks_per_group=1,
+                    use_stream=True,
+                )
             else:
                 logger.info(
                     f"Using sequential CPU offload ({total_vram_gb:.1f}GB VRAM) - fits in 16GB"
                 )
+                # Must happen before the offload hooks snapshot the CPU weights
+                if config.pin_offload_memory:
+                    self._pin_cpu_weights()
                 self.pipeline.enable_sequential_cpu_offload()
 
-            # Enable memory-efficient attention (flash attention if available, otherwise SDPA)
-            try:
-                self.pipeline.enable_xformers_memory_efficient_attention()
-                logger.info("Enabled xFormers memory-efficient attention")
-            except Exception:
-                # xFormers not available, try PyTorch's SDPA
+            # Diffusers' FLUX attention processors call PyTorch SDPA. generate() only rules
+            # out the cuDNN backend: FlashAttention and memory-efficient kernels are tried
+            # first, with the math kernel as the fallback. xFormers is only used when the
+            # flash SDPA backend has been disabled.
+            if torch.backends.cuda.flash_sdp_enabled():
+                logger.info("Using PyTorch SDPA (FlashAttention / memory-efficient kernels)")
+            else:
                 try:
-                    # PyTorch 2.0+ has built-in scaled dot product attention
-                    if hasattr(torch.nn.functional, "scaled_dot_product_attention"):
-                        logger.info("Using PyTorch SDPA (scaled dot product attention)")
-                    else:
-                        logger.info("No accelerated attention available")
+                    self.pipeline.enable_xformers_memory_efficient_attention()
+                    logger.info("Enabled xFormers memory-efficient attention")
                 except Exception:
-                    logger.info("Using default attention mechanism")
+                    logger.info("Using PyTorch SDPA (math kernel)")
         elif self._device == "mps":
             available_gb = _get_available_memory_gb()
             logger.info(f"Apple Silicon (MPS) — {available_gb:.1f}GB unified memory available")
@@ -157,66 +305,259 @@ class FluxGenerator:
             logger.warning("No GPU detected — loading to CPU (very slow)")
             self.pipeline.to("cpu")
 
+        # ROCm requires a CPU generator (same limitation as MPS)
+        gen_device = "cuda" if (self._device == "cuda" and not self._is_rocm) else "cpu"
+        self._generator = torch.Generator(device=gen_device)
+
+        if self._compiled:
+            self._warmup()
+
         load_time = time.time() - start_time
         logger.info(f"Model loaded successfully in {load_time:.2f}s")
 
         # Update last access time
         self._last_access = datetime.now()
 
+    def _select_dtype(self, model_id: str) -> torch.dtype:
+        """Pick the compute dtype the device has fast (tensor core) support for.
+
+        bfloat16 needs Ampere (SM 8.0) or newer on NVIDIA; older GPUs emulate it and
+        run slower than float16. FLUX.2 stays in bfloat16 there anyway: its Mistral
+        text encoder and transformer overflow in float16 (NaNs, black images), and
+        its text encoder is too large to keep in float32. MPS uses float16, ROCm
+        keeps bfloat16.
+        """
+        if self._device == "mps":
+            return torch.float16
+        if torch.cuda.is_available() and not self._is_rocm and "FLUX.2" not in model_id:
+            major, _ = torch.cuda.get_device_capability(0)
+            if major < 8:
+                return torch.float16
+        return torch.bfloat16
+
+    def _quantization_kwargs(self) -> dict:
+        """Return from_pretrained kwargs for load-time (bitsandbytes int4) quantization."""
+        if config.quantization != "int4":
+            return {}
+        if self._device != "cuda":
+            logger.warning("int4 quantization requires CUDA — loading unquantized weights")
+            return {}
+        try:
+            import bitsandbytes  # noqa: F401
+            from diffusers.quantizers import PipelineQuantizationConfig
+        except ImportError:
+            logger.warning("bitsandbytes not installed — loading unquantized weights")
+            return {}
+
+        logger.info("Quantizing transformer to int4 (bitsandbytes NF4)")
+        return {
+            "quantization_config": PipelineQuantizationConfig(
+                quant_backend="bitsandbytes_4bit",
+                quant_kwargs={
+                    "load_in_4bit": True,
+                    "bnb_4bit_quant_type": "nf4",
+                    "bnb_4bit_compute_dtype": self._dtype,
+                },
+                components_to_quantize=["transformer"],
+            )
+        }
+
+    def _quantize_transformer(self, mode: str) -> None:
+        """Apply torchao weight-only quantization (fp8 or int8) to the transformer."""
+        if self._device != "cuda":
+            logger.warning(f"{mode} quantization requires CUDA — keeping unquantized weights")
+            return
+        if mode == "fp8" and torch.cuda.get_device_capability(0)[0] < 9:
+            logger.warning(
+                "fp8 quantization requires compute capability 9.0+ — keeping unquantized weights"
+            )
+            return
+        try:
+            from torchao.quantization import (
+                Float8WeightOnlyConfig,
+                Int8WeightOnlyConfig,
+                quantize_,
+            )
+        except ImportError:
+            logger.warning("torchao not installed — keeping unquantized weights")
+            return
+
+        quant_config = Float8WeightOnlyConfig() if mode == "fp8" else Int8WeightOnlyConfig()
+        quantize_(self.pipeline.transformer, quant_config)
+        logger.info(f"Quantized transformer weights to {mode} (torchao)")
+
+    def _pin_cpu_weights(self) -> None:
+        """Move all pipeline weights into page-locked host memory for faster transfers."""
+        start_time = time.time()
+        for component in self.pipeline.components.values():
+            if isinstance(component, torch.nn.Module):
+                for param in component.parameters():
+                    param.data = param.data.pin_memory()
+        logger.info(f"Pinned offload weights in host memory in {time.time() - start_time:.2f}s")
+
+    def _compile_transformer(self) -> None:
+        """Compile the transformer with CUDA graphs to cut per-step launch overhead."""
+        import torch._inductor.config
+
+        torch._inductor.config.fx_graph_cache = True
+        self.pipeline.transformer = torch.compile(
+            self.pipeline.transformer, mode="reduce-overhead", dynamic=False
+        )
+        self._compiled = True
+        self._compiled_shapes = {(1024, 1024, 1)}  # Covered by the load-time warmup
+        logger.info("Compiled transformer with torch.compile (reduce-overhead)")
+
+    def _warmup(self) -> None:
+        """Run a throwaway 1-step inference so compilation happens at load time."""
+        logger.info("Warming up compiled transformer (first compile may take a few minutes)")
+        start_time = time.time()
+        with self._inference_context():
+            self.pipeline(
+                **self._encode_prompt("warmup"),
+                num_inference_steps=1,
+                width=1024,
+                height=1024,
+                output_type="latent",
+            )
+        logger.info(f"Warmup finished in {time.time() - start_time:.2f}s")
+
+    def _encode_prompt(self, prompt: str) -> dict:
+        """Return prompt-embedding kwargs for the pipeline, using an LRU cache.
+
+        Re-running a prompt (e.g. a seed sweep) skips the text encoders entirely,
+        which on offload paths also avoids moving them back onto the GPU.
+        Must be called inside the inference context with ``self._lock`` held.
+        """
+        key = (prompt, self._current_model_id)
+        cached = self._prompt_cache.get(key)
+        if cached is None:
+            encoded = self.pipeline.encode_prompt(
+                prompt=prompt, device=self.pipeline._execution_device
+            )
+            # FLUX.1 returns (prompt_embeds, pooled_prompt_embeds, text_ids),
+            # FLUX.2 returns (prompt_embeds, text_ids); keep CPU copies to spare VRAM
+            cached = {"prompt_embeds": encoded[0].cpu()}
+            if isinstance(self.pipeline, FluxPipeline):
+                cached["pooled_prompt_embeds"] = encoded[1].cpu()
+            self._prompt_cache[key] = cached
+            if len(self._prompt_cache) > _PROMPT_CACHE_SIZE:
+                self._prompt_cache.popitem(last=False)
+        else:
+            self._prompt_cache.move_to_end(key)
+            logger.debug("Reusing cached prompt embeddings")
+
+        # Text encoders may run in float32 (fp16 path); the transformer expects _dtype
+        device = self.pipeline._execution_device
+        return {name: tensor.to(device, dtype=self._dtype) for name, tensor in cached.items()}
+
+    def _set_vae_tiling(self, enabled: bool) -> None:
+        """Enable or disable tiled VAE decoding if the loaded VAE supports it."""
+        vae = self.pipeline.vae
+        if enabled and hasattr(vae, "enable_tiling"):
+            vae.enable_tiling()
+        elif not enabled and hasattr(vae, "disable_tiling"):
+            vae.disable_tiling()
+
+    def _inference_context(self) -> contextlib.ExitStack:
+        """Return a context for pipeline calls: no autograd tracking, fused SDPA on CUDA."""
+        stack = contextlib.ExitStack()
+        stack.enter_context(torch.inference_mode())
+        if self._device == "cuda":
+            stack.enter_context(
+                sdpa_kernel(
+                    [SDPBackend.FLASH_ATTENTION, SDPBackend.EFFICIENT_ATTENTION, SDPBackend.MATH]
+                )
+            )
+        return stack
+
     def _schedule_unload(self) -> None:
-        """Schedule automatic model unload after timeout."""
+        """Ensure the idle monitor is running so the model unloads after the timeout.
+
+        Must be called with ``self._lock`` held.
+        """
         # Skip if auto-unload is disabled (e.g., CLI mode)
         if not self.auto_unload:
             logger.debug("Auto-unload disabled (CLI mode)")
             return
 
-        # Cancel existing timer if any
-        if self._unload_timer is not None:
-            self._unload_timer.cancel()
-
         # Don't schedule if timeout is 0 (disabled)
         if config.unload_timeout <= 0:
             logger.debug("Auto-unload disabled (timeout = 0)")
             return
 
-        logger.debug(f"Scheduling auto-unload in {config.unload_timeout}s")
-        self._unload_timer = threading.Timer(config.unload_timeout, self._auto_unload)
-        self._unload_timer.daemon = True
-        self._unload_timer.start()
+        if self._monitor_thread is not None:
+            logger.debug(f"Auto-unload after {config.unload_timeout}s idle (monitor running)")
+            return
 
-    def _auto_unload(self) -> None:
-        """Auto-unload callback (runs in timer thread)."""
-        logger.info("Auto-unload triggered")
-        self.unload_model()
+        logger.debug(f"Starting auto-unload monitor ({config.unload_timeout}s idle timeout)")
+        self._monitor_thread = threading.Thread(
+            target=self._monitor_idle, name="flux-auto-unload", daemon=True
+        )
+        self._monitor_thread.start()
+
+    def _monitor_idle(self) -> None:
+        """Idle monitor loop (runs in a daemon thread until the model is unloaded)."""
+        while True:
+            time.sleep(_UNLOAD_POLL_SECONDS)
+            # A held lock means a generation (or load) is in progress; check again later
+            if not self._lock.acquire(blocking=False):
+                continue
+            try:
+                if self.pipeline is None:
+                    self._monitor_thread = None
+                    return
+
+                timeout = config.unload_timeout
+                if timeout > 0 and self._last_access is not None:
+                    idle = (datetime.now() - self._last_access).total_seconds()
+                    if idle >= timeout:
+                        logger.info("Auto-unload triggered")
+                        self._unload_locked()
+                        self._monitor_thread = None
+                        return
+            finally:
+                self._lock.release()
 
     def unload_model(self) -> None:
         """Unload the model and free GPU memory."""
         with self._lock:
-            # Cancel pending timer
-            if self._unload_timer is not None:
-                self._unload_timer.cancel()
-                self._unload_timer = None
+            self._unload_locked()
 
-            if self.pipeline is None:
-                logger.debug("Model already unloaded")
-                return
+    def _unload_locked(self, collect: bool | None = None) -> None:
+        """Unload the model. Caller must hold ``self._lock`` (or own the generator).
 
-            logger.info("Unloading FLUX model")
+        Args:
+            collect: Run a full gc.collect() before clearing the device cache
+                     (default: config.aggressive_gc)
+        """
+        if self.pipeline is None:
+            logger.debug("Model already unloaded")
+            return
 
-            # Delete pipeline
-            del self.pipeline
-            self.pipeline = None
-            self._current_model_id = None
-            self._last_access = None
+        logger.info("Unloading FLUX model")
+
+        # Delete pipeline
+        del self.pipeline
+        self.pipeline = None
+        self._current_model_id = None
+        self._last_access = None
+        self._generator = None
+        self._defaults = {}
+        self._prompt_cache.clear()
+        self._compiled = False
+        self._compiled_shapes.clear()
+
+        # Collect first so memory freed by the collector is also returned by empty_cache
+        if config.aggressive_gc if collect is None else collect:
+            gc.collect()
 
-            if self._device == "cuda":
-                torch.cuda.empty_cache()
-                torch.cuda.synchronize()
-            elif self._device == "mps":
-                torch.mps.empty_cache()
+        if self._device == "cuda":
+            torch.cuda.empty_cache()
+            torch.cuda.ipc_collect()
+        elif self._device == "mps":
+            torch.mps.empty_cache()
 
-            gc.collect()
-            logger.info(f"Model unloaded and {self._device} cache cleared")
+        logger.info(f"Model unloaded and {self._device} cache cleared")
 
     def generate(
         self,
@@ -228,7 +569,8 @@ class FluxGenerator:
         seed: int | None = None,
         model: str | None = None,
         progress_callback: Callable[[int, int], None] | None = None,
-    ) -> tuple[Path, int, dict, Image.Image]:
+        output_path: Path | None = None,
+    ) -> tuple[Path, int, dict, Image.Image, str]:
         """Generate an image from a text prompt.
 
         Args:
@@ -240,103 +582,229 @@ class FluxGenerator:
             seed: Random seed for reproducibility (default: random)
             model: Model to use - "flux1-dev" (faster quality) or "flux2-dev" (maximum quality, default)
             progress_callback: Optional callback function(step, total_steps) for progress updates
+            output_path: Optional destination file (default: {timestamp}_{seed}.png in the
+                         output directory). Its parent directory is created if missing,
+                         unless FLUX_STRICT_NO_MKDIR=1.
 
         Returns:
-            Tuple of (output_path, seed_used, generation_settings, pil_image)
+            Tuple of (output_path, seed_used, generation_settings, pil_image, image_id)
         """
-        with self._lock:
-            # Resolve model preset to full model ID
-            model_id = None
-            if model:
-                model_id = config.models.get(model, model)  # Allow preset or full ID
+        # Pure argument handling needs no GPU state, so it runs before taking the lock
+        # Resolve model preset to full model ID
+        model_id = None
+        if model:
+            model_id = config.models.get(model, model)  # Allow preset or full ID
+
+        if seed is None:
+            seed = secrets.randbits(32)
+
+        # Fail before spending GPU time if the image could not be written
+        config.ensure_output_dir(output_path.parent if output_path is not None else None)
+
+        request = _GenerationRequest(
+            prompt=prompt,
+            steps=steps,
+            guidance_scale=guidance_scale,
+            width=width,
+            height=height,
+            seed=seed,
+            model_id=model_id,
+            progress_callback=progress_callback,
+        )
 
-            # Load model if needed (or switch models)
-            self._load_model(model_id)
+        if config.batch_window_ms <= 0:
+            with self._lock:
+                self._run_batch([request])
+        else:
+            # Coalesce concurrent requests: whoever gets the lock first waits briefly,
+            # then runs every queued request with matching settings in one pipeline call
+            with self._queue_lock:
+                self._batch_queue.append(request)
+            with self._lock:
+                if not request.done:
+                    time.sleep(config.batch_window_ms / 1000)
+                    self._run_batch(self._take_batch(request))
+
+        if request.error is not None:
+            # Drop every reference to the error on the way out so its traceback (and
+            # the failed call's tensors) can be freed once the caller handles it
+            error, request.error = request.error, None
+            try:
+                raise error
+            finally:
+                del error
+        pil_image, metadata, gen_time, now = request.result
+        seed = metadata["seed"]
+
+        # Everything below is CPU/disk work that doesn't need the pipeline, so it runs
+        # outside the lock and the next request can start denoising right away
+
+        # Create PNG metadata with individual fields only
+        png_info = PngInfo()
+        for key, value in metadata.items():
+            png_info.add_text(key, str(value))
+
+        # Save image with embedded metadata
+        if output_path is None:
+            timestamp = time.strftime("%Y%m%d_%H%M%S", now)
+            output_path = config.output_dir / f"{timestamp}_{seed}.png"
+        image_id = output_path.stem
+        self._submit_save(pil_image, output_path, png_info)
+
+        # Track last generated image for preview
+        self._last_image_id = image_id
+
+        logger.info(f"Image generated in {gen_time:.2f}s: {output_path}")
+
+        # Return generation info
+        settings = {
+            key: metadata[key] for key in ("prompt", "steps", "guidance_scale", "width", "height")
+        }
+        settings["generation_time"] = f"{gen_time:.2f}s"
+        settings["generation_time_seconds"] = gen_time
+
+        return output_path, seed, settings, pil_image, image_id
+
+    def _take_batch(self, leader: _GenerationRequest) -> list[_GenerationRequest]:
+        """Remove and return the leader plus queued requests that can share its pipeline call."""
+        with self._queue_lock:
+            batch = [leader]
+            for queued in self._batch_queue:
+                if len(batch) >= config.max_batch_size:
+                    break
+                if queued is not leader and queued.batch_key == leader.batch_key:
+                    batch.append(queued)
+            self._batch_queue = [r for r in self._batch_queue if r not in batch]
+        return batch
+
+    def _run_batch(self, batch: list[_GenerationRequest]) -> None:
+        """Run one pipeline call for requests sharing a batch key. Caller holds ``self._lock``.
+
+        Results (or the raised exception) are stored on each request.
+        """
+        try:
+            self._run_batch_locked(batch)
+        except BaseException as e:
+            for request in batch:
+                request.error = e
+        finally:
+            for request in batch:
+                request.done = True
+
+    def _run_batch_locked(self, batch: list[_GenerationRequest]) -> None:
+        """Load the model, denoise every request in ``batch`` together and record results."""
+        first = batch[0]
+
+        # Load model if needed (or switch models)
+        self._load_model(first.model_id)
 
-            # Update last access time
-            self._last_access = datetime.now()
+        # Update last access time
+        self._last_access = datetime.now()
 
-            # Use model-specific smart defaults if not specified
-            current_model_defaults = config.model_defaults.get(self._current_model_id, {})
-            if steps is None:
-                steps = current_model_defaults.get("steps", config.default_steps)
-            if guidance_scale is None:
-                guidance_scale = current_model_defaults.get("guidance", config.default_guidance)
+        # Use model-specific smart defaults (resolved at load time) if not specified
+        steps = first.steps if first.steps is not None else self._defaults["steps"]
+        guidance_scale = first.guidance_scale
+        if guidance_scale is None:
+            guidance_scale = self._defaults["guidance"]
+        width, height = first.width, first.height
+
+        # Compiled graphs are specialized per shape; snapping to FLUX's 64px patch
+        # stride bounds the number of distinct graphs (and recompiles)
+        if self._compiled:
+            width = _snap_dim(width)
+            height = _snap_dim(height)
+            if (width, height, len(batch)) not in self._compiled_shapes:
+                logger.info(f"Compiling transformer for new shape {width}x{height}")
+                self._compiled_shapes.add((width, height, len(batch)))
+
+        seeds = [request.seed for request in batch]
+        logger.info(
+            f"Generating {len(batch)} image(s) with seed(s)={seeds}, steps={steps}, "
+            f"guidance={guidance_scale}"
+        )
 
-            if seed is None:
-                seed = torch.randint(0, 2**32 - 1, (1,), device="cpu").item()
+        # Tile the VAE decode for large images so it doesn't OOM before the transformer
+        self._set_vae_tiling(width * height > config.vae_tiling_threshold)
 
-            logger.info(
-                f"Generating image with seed={seed}, steps={steps}, guidance={guidance_scale}"
-            )
+        # Reuse the generator created at load time; only its seed changes per call.
+        # Batched calls need one generator per image so each seed stays reproducible.
+        if len(batch) == 1:
+            generator = self._generator.manual_seed(first.seed)
+        else:
+            generator = [
+                torch.Generator(device=self._generator.device).manual_seed(seed) for seed in seeds
+            ]
 
-            # ROCm requires a CPU generator (same limitation as MPS)
-            gen_device = "cuda" if (self._device == "cuda" and not self._is_rocm) else "cpu"
-            generator = torch.Generator(device=gen_device).manual_seed(seed)
+        # Create callback wrapper for diffusers pipeline (only when something needs it)
+        callbacks = [r.progress_callback for r in batch if r.progress_callback is not None]
+        step_callback = None
+        if callbacks or self._compiled:
+            compiled = self._compiled
 
-            # Create callback wrapper for diffusers pipeline
             def step_callback(pipe, step_index, timestep, callback_kwargs):
-                if progress_callback:
+                if compiled:
+                    # Each denoising step is a new CUDA graph replay
+                    torch.compiler.cudagraph_mark_step_begin()
+                for callback in callbacks:
                     # Call user's progress callback with current step and total
-                    progress_callback(step_index + 1, steps)
+                    callback(step_index + 1, steps)
                 return callback_kwargs
 
-            # Generate image
-            start_time = time.time()
+        # Generate image(s)
+        start_time = time.time()
+        with self._inference_context():
+            embeds = [self._encode_prompt(request.prompt) for request in batch]
+            prompt_kwargs = {name: torch.cat([e[name] for e in embeds]) for name in embeds[0]}
             result = self.pipeline(
-                prompt=prompt,
+                **prompt_kwargs,
                 num_inference_steps=steps,
                 guidance_scale=guidance_scale,
                 width=width,
                 height=height,
                 generator=generator,
-                callback_on_step_end=step_callback if progress_callback else None,
+                callback_on_step_end=step_callback,
             )
-            if self._device == "mps":
-                torch.mps.synchronize()
-            gen_time = time.time() - start_time
-
-            pil_image = result.images[0]
-
-            # Create PNG metadata with individual fields only
-            timestamp_iso = datetime.now().isoformat()
-            png_info = PngInfo()
-            png_info.add_text("prompt", prompt)
-            png_info.add_text("seed", str(seed))
-            png_info.add_text("steps", str(steps))
-            png_info.add_text("guidance_scale", str(guidance_scale))
-            png_info.add_text("width", str(width))
-            png_info.add_text("height", str(height))
-            png_info.add_text("model", self._current_model_id)
-            png_info.add_text("generation_time_seconds", str(round(gen_time, 2)))
-            png_info.add_text("timestamp", timestamp_iso)
-
-            # Save image with embedded metadata
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            image_id = f"{timestamp}_{seed}"
-            filename = f"{image_id}.png"
-            output_path = config.output_dir / filename
-            pil_image.save(output_path, pnginfo=png_info)
-
-            # Track last generated image for preview
-            self._last_image_id = image_id
-
-            logger.info(f"Image generated in {gen_time:.2f}s: {output_path}")
-
-            # Schedule auto-unload
-            self._schedule_unload()
-
-            # Return generation info
-            settings = {
-                "prompt": prompt,
+        if self._device == "mps":
+            torch.mps.synchronize()
+        gen_time = time.time() - start_time
+
+        # One localtime() call feeds both the metadata and the filename timestamp
+        now = time.localtime()
+        timestamp_iso = time.strftime("%Y-%m-%dT%H:%M:%S%z", now)
+        for request, pil_image in zip(batch, result.images, strict=True):
+            metadata = {
+                "prompt": request.prompt,
+                "seed": request.seed,
                 "steps": steps,
                 "guidance_scale": guidance_scale,
                 "width": width,
                 "height": height,
-                "generation_time": f"{gen_time:.2f}s",
+                "model": self._current_model_id,
+                "generation_time_seconds": round(gen_time, 2),
+                "timestamp": timestamp_iso,
             }
+            request.result = (pil_image, metadata, gen_time, now)
+
+        # Idle time counts from the end of generation, not its start
+        self._last_access = datetime.now()
+
+        # Schedule auto-unload
+        self._schedule_unload()
 
-            return output_path, seed, settings, pil_image, image_id
+    def _submit_save(self, pil_image: Image.Image, output_path: Path, png_info: PngInfo) -> None:
+        """Encode and write the PNG on the I/O pool instead of the calling thread."""
+        future = self._io_pool.submit(_save_png, pil_image, output_path, png_info)
+        future.add_done_callback(_log_save_error)
+        with self._saves_lock:
+            self._pending_saves = {p: f for p, f in self._pending_saves.items() if not f.done()}
+            self._pending_saves[output_path] = future
+
+    def wait_for_save(self, path: Path) -> None:
+        """Block until a pending background save of ``path`` (if any) has finished."""
+        with self._saves_lock:
+            future = self._pending_saves.get(path)
+        if future is not None:
+            future.result()
 
     def get_preview(self, image_id: str | None = None) -> tuple[Path, Path] | None:
         """Get the full-size and thumbnail paths for an image.
@@ -353,7 +821,8 @@ class FluxGenerator:
             return None
 
         full_path = config.output_dir / f"{target_id}.png"
-        thumb_path = config.output_dir / f"{target_id}_thumb.png"
+        self.wait_for_save(full_path)
+        thumb_path = _thumbnail_path(full_path)
 
         if not full_path.exists():
             return None
@@ -366,35 +835,38 @@ class FluxGenerator:
         Returns:
             Dictionary with status information
         """
-        with self._lock:
-            is_loaded = self.pipeline is not None
-
-            # Calculate time until auto-unload
-            time_until_unload = None
-            if is_loaded and self._last_access is not None:
-                elapsed = (datetime.now() - self._last_access).total_seconds()
-                remaining = max(0, config.unload_timeout - elapsed)
-                time_until_unload = f"{remaining:.1f}s"
-
-            vram_usage = None
-            if self._device == "cuda" and torch.cuda.is_available():
-                allocated = torch.cuda.memory_allocated() / (1024**3)
-                reserved = torch.cuda.memory_reserved() / (1024**3)
-                vram_usage = {
-                    "allocated_gb": f"{allocated:.2f}",
-                    "reserved_gb": f"{reserved:.2f}",
-                }
-            elif self._device == "mps":
-                vram_usage = {
-                    "available_unified_gb": f"{_get_available_memory_gb():.2f}",
-                }
-
-            return {
-                "model_loaded": is_loaded,
-                "current_model": self._current_model_id,
-                "device": self._device,
-                "time_until_unload": time_until_unload,
-                "timeout_seconds": config.unload_timeout,
-                "vram_usage": vram_usage,
-                "last_access": self._last_access.isoformat() if self._last_access else None,
+        # Lock-free: a generation holds self._lock for minutes, and status must answer
+        # meanwhile. Shared fields are read once up front and only the copies are used.
+        is_loaded = self.pipeline is not None
+        current_model = self._current_model_id
+        last_access = self._last_access
+
+        # Calculate time until auto-unload
+        time_until_unload = None
+        if is_loaded and last_access is not None:
+            elapsed = (datetime.now() - last_access).total_seconds()
+            remaining = max(0, config.unload_timeout - elapsed)
+            time_until_unload = f"{remaining:.1f}s"
+
+        vram_usage = None
+        if self._device == "cuda" and torch.cuda.is_available():
+            allocated = torch.cuda.memory_allocated() / (1024**3)
+            reserved = torch.cuda.memory_reserved() / (1024**3)
+            vram_usage = {
+                "allocated_gb": f"{allocated:.2f}",
+                "reserved_gb": f"{reserved:.2f}",
             }
+        elif self._device == "mps":
+            vram_usage = {
+                "available_unified_gb": f"{_get_available_memory_gb():.2f}",
+            }
+
+        return {
+            "model_loaded": is_loaded,
+            "current_model": current_model,
+            "device": self._device,
+            "time_until_unload": time_until_unload,
+            "timeout_seconds": config.unload_timeout,
+            "vram_usage": vram_usage,
+            "last_access": last_access.isoformat() if last_access else None,
+        }
@@ -1,17 +1,30 @@
 """MCP Server for FLUX image generation."""
 
+import asyncio
 import base64
+import contextvars
 import io
 import logging
+import threading
+from pathlib import Path
 from typing import Any
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
-from mcp.types import ImageContent, TextContent, Tool
+from mcp.types import ImageContent, ResourceLink, TextContent, Tool
 from PIL import Image
 
 from .config import config
-from .generator import FluxGenerator
+from .generator import FluxGenerator, _make_thumbnail, _thumbnail_path
+
+try:
+    # SIMD-accelerated base64 (optional speedups extra)
+    from pybase64 import b64encode_as_string
+except ImportError:
+
+    def b64encode_as_string(data: bytes | memoryview) -> str:
+        return base64.b64encode(data).decode("ascii")
+
 
 # Set up logging
 logging.basicConfig(
@@ -20,233 +33,368 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# get_status message templates, rendered with %-formatting against the status dict
+_STATUS_LOADED_TMPL = """🟢 FLUX Model Status: LOADED
+
+🎨 Current model: %(current_model)s
+⏱️  Time until auto-unload: %(time_until_unload)s
+⚙️  Auto-unload timeout: %(timeout_seconds)ss
+📅 Last access: %(last_access)s
+"""
+_STATUS_UNLOADED_TMPL = """🔴 FLUX Model Status: NOT LOADED
+
+⚙️  Auto-unload timeout: %(timeout_seconds)ss
+💡 Model will load automatically on next generation request.
+"""
+_VRAM_TMPL = """
+🎮 VRAM Usage:
+  - Allocated: %(allocated_gb)s GB
+  - Reserved: %(reserved_gb)s GB
+"""
+
+# Inclusive (field, min, max) ranges checked for generate_image arguments
+_BOUNDS = (("steps", 1, 100), ("width", 256, 2048), ("height", 256, 2048))
+
+# Minimum time between progress notifications for one generation
+_PROGRESS_INTERVAL_SECONDS = 0.25
+
+# Set while batch_execute runs its operations. They share the batch's progressToken,
+# so per-operation progress streams would interleave on one token.
+_IN_BATCH: contextvars.ContextVar[bool] = contextvars.ContextVar("_IN_BATCH", default=False)
+
+# Edge length of the square box the preview thumbnail is fitted into
+_THUMBNAIL_SIZE = 512
+
+# Reused thumbnail PNG buffer; the lock covers concurrent generate_image workers
+_PNG_BUF = io.BytesIO()
+_PNG_BUF_LOCK = threading.Lock()
+
 # Initialize server and generator
 app = Server("flux-mcp")
 generator = FluxGenerator()
 
 
-@app.list_tools()
-async def list_tools() -> list[Tool]:
-    """List available tools."""
-    return [
-        Tool(
-            name="generate_image",
-            description=(
-                "Generate high-quality images using FLUX models. "
-                "Two models available: FLUX.1-dev (faster, 40 steps default) and FLUX.2-dev (highest quality, 50 steps default). "
-                "Both models are optimized for quality output. "
-                "Images are saved to the configured output directory with embedded metadata. "
-                "IMPORTANT: This tool is LONG-RUNNING and NON-BLOCKING. "
-                "flux1-dev takes ~4-8 min, flux2-dev takes ~30-40 min. "
-                "The MCP client may receive a timeout error - this is EXPECTED and NORMAL. "
-                "Do NOT treat a timeout as a failure. Inform the user that generation is "
-                "running in the background and they should upload the result image when ready."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "prompt": {
-                        "type": "string",
-                        "description": "Text description of the image to generate",
-                    },
-                    "model": {
-                        "type": "string",
-                        "description": "Model to use: 'flux1-dev' (faster quality, ~4-8 min) or 'flux2-dev' (highest quality, ~30-40 min on 16GB). Both optimized for quality. Default: flux2-dev",
-                        "enum": ["flux1-dev", "flux2-dev"],
-                        "default": "flux2-dev",
-                    },
-                    "steps": {
-                        "type": "integer",
-                        "description": "Number of inference steps. Model-specific defaults: FLUX.1-dev=40, FLUX.2-dev=50. Range: 20-100",
-                    },
-                    "guidance_scale": {
-                        "type": "number",
-                        "description": "Guidance scale for prompt adherence. Default 7.5 for strong adherence. Use 3.0-4.0 for faster/looser results. Range: 1.0-10.0",
-                        "default": 7.5,
-                    },
-                    "width": {
-                        "type": "integer",
-                        "description": "Image width in pixels (default: 1024)",
-                        "default": 1024,
-                    },
-                    "height": {
-                        "type": "integer",
-                        "description": "Image height in pixels (default: 1024)",
-                        "default": 1024,
-                    },
-                    "seed": {
-                        "type": "integer",
-                        "description": "Random seed for reproducibility (optional, random if not provided)",
-                    },
+# Tool schemas never change, so build them once at import instead of per listing
+_TOOLS: list[Tool] = [
+    Tool(
+        name="generate_image",
+        description=(
+            "Generate high-quality images using FLUX models. "
+            "Two models available: FLUX.1-dev (faster, 40 steps default) and FLUX.2-dev (highest quality, 50 steps default). "
+            "Both models are optimized for quality output. "
+            "Images are saved to the configured output directory with embedded metadata. "
+            "IMPORTANT: This tool is LONG-RUNNING and NON-BLOCKING. "
+            "flux1-dev takes ~4-8 min, flux2-dev takes ~30-40 min. "
+            "The MCP client may receive a timeout error - this is EXPECTED and NORMAL. "
+            "Do NOT treat a timeout as a failure. Inform the user that generation is "
+            "running in the background and they should upload the result image when ready."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "prompt": {
+                    "type": "string",
+                    "description": "Text description of the image to generate",
+                },
+                "model": {
+                    "type": "string",
+                    "description": "Model to use: 'flux1-dev' (faster quality, ~4-8 min) or 'flux2-dev' (highest quality, ~30-40 min on 16GB). Both optimized for quality. Default: the server's configured model (FLUX_MODEL_ID; flux2-dev, or flux1-dev on Apple Silicon)",
+                    "enum": ["flux1-dev", "flux2-dev"],
+                },
+                "steps": {
+                    "type": "integer",
+                    "description": "Number of inference steps. Model-specific defaults: FLUX.1-dev=40, FLUX.2-dev=50. Range: 20-100",
+                },
+                "guidance_scale": {
+                    "type": "number",
+                    "description": "Guidance scale for prompt adherence. Default: the model's configured guidance (7.5 for strong adherence). Use 3.0-4.0 for faster/looser results. Range: 1.0-10.0",
+                },
+                "width": {
+                    "type": "integer",
+                    "description": "Image width in pixels (default: 1024)",
+                    "default": 1024,
+                },
+                "height": {
+                    "type": "integer",
+                    "description": "Image height in pixels (default: 1024)",
+                    "default": 1024,
+                },
+                "seed": {
+                    "type": "integer",
+                    "description": "Random seed for reproducibility (optional, random if not provided)",
                 },
-                "required": ["prompt"],
             },
+            "required": ["prompt"],
+        },
+    ),
+    Tool(
+        name="unload_model",
+        description=(
+            "Immediately unload the FLUX model from GPU memory. "
+            "Use this to free up VRAM when you're done generating images. "
+            "The model will be automatically reloaded on the next generation request."
         ),
-        Tool(
-            name="unload_model",
-            description=(
-                "Immediately unload the FLUX model from GPU memory. "
-                "Use this to free up VRAM when you're done generating images. "
-                "The model will be automatically reloaded on the next generation request."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {},
-            },
+        inputSchema={
+            "type": "object",
+            "properties": {},
+        },
+    ),
+    Tool(
+        name="get_status",
+        description=(
+            "Get current status of the FLUX generator. "
+            "Shows whether the model is loaded, time until auto-unload, "
+            "and current VRAM usage."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {},
+        },
+    ),
+    Tool(
+        name="set_timeout",
+        description=(
+            "Set the auto-unload timeout for the FLUX model. "
+            "The model will automatically unload after this many seconds of inactivity. "
+            "Set to 0 to disable auto-unload."
         ),
-        Tool(
-            name="get_status",
-            description=(
-                "Get current status of the FLUX generator. "
-                "Shows whether the model is loaded, time until auto-unload, "
-                "and current VRAM usage."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {},
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "timeout_seconds": {
+                    "type": "integer",
+                    "description": "Timeout in seconds (0 to disable auto-unload)",
+                },
             },
+            "required": ["timeout_seconds"],
+        },
+    ),
+    Tool(
+        name="get_preview",
+        description=(
+            "Retrieve a preview (thumbnail) of a generated image. "
+            "Use this after generate_image completes — especially useful for FLUX.2-dev "
+            "background generations where the MCP client timed out. "
+            "Pass the image_id from generate_image output, or omit to get the last generated image. "
+            "Returns the thumbnail inline and the full-size image path."
         ),
-        Tool(
-            name="set_timeout",
-            description=(
-                "Set the auto-unload timeout for the FLUX model. "
-                "The model will automatically unload after this many seconds of inactivity. "
-                "Set to 0 to disable auto-unload."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "timeout_seconds": {
-                        "type": "integer",
-                        "description": "Timeout in seconds (0 to disable auto-unload)",
-                    },
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "image_id": {
+                    "type": "string",
+                    "description": "Image ID returned by generate_image (e.g. '20250126_143052_42'). Omit to get the last generated image.",
                 },
-                "required": ["timeout_seconds"],
             },
+        },
+    ),
+    Tool(
+        name="batch_execute",
+        description=(
+            "Run several of the other tools in one call, e.g. get_status plus set_timeout. "
+            "Operations run concurrently (up to maxConcurrent at a time); image generations "
+            "still share the single GPU. Results are returned in operation order."
         ),
-        Tool(
-            name="get_preview",
-            description=(
-                "Retrieve a preview (thumbnail) of a generated image. "
-                "Use this after generate_image completes — especially useful for FLUX.2-dev "
-                "background generations where the MCP client timed out. "
-                "Pass the image_id from generate_image output, or omit to get the last generated image. "
-                "Returns the thumbnail inline and the full-size image path."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "image_id": {
-                        "type": "string",
-                        "description": "Image ID returned by generate_image (e.g. '20250126_143052_42'). Omit to get the last generated image.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "operations": {
+                    "type": "array",
+                    "description": "Tool calls to run",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {
+                                "type": "string",
+                                "description": "Tool name (any tool except batch_execute)",
+                            },
+                            "arguments": {
+                                "type": "object",
+                                "description": "Arguments for the tool",
+                            },
+                        },
+                        "required": ["name"],
                     },
                 },
+                "maxConcurrent": {
+                    "type": "integer",
+                    "description": "Maximum operations running at once (default: 4)",
+                    "default": 4,
+                },
             },
-        ),
-    ]
+            "required": ["operations"],
+        },
+    ),
+]
 
 
-@app.call_tool()
-async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageContent]:
-    """Handle tool calls."""
-    try:
-        if name == "generate_image":
-            # Extract parameters
-            prompt = arguments["prompt"]
-            model = arguments.get("model", "flux2-dev")
-            steps = arguments.get("steps", 50)
-            guidance_scale = arguments.get("guidance_scale", 7.5)
-            width = arguments.get("width", 1024)
-            height = arguments.get("height", 1024)
-            seed = arguments.get("seed")
-
-            # Validate parameters
-            if not prompt.strip():
-                return [TextContent(type="text", text="Error: Prompt cannot be empty")]
-
-            if steps < 1 or steps > 100:
-                return [
-                    TextContent(
-                        type="text",
-                        text="Error: Steps must be between 1 and 100",
-                    )
-                ]
-
-            if width < 256 or width > 2048 or height < 256 or height > 2048:
-                return [
-                    TextContent(
-                        type="text",
-                        text="Error: Width and height must be between 256 and 2048",
-                    )
-                ]
-
-            # Get progress token if provided
-            progress_token = None
-            if hasattr(app, "request_context") and app.request_context:
-                meta = getattr(app.request_context, "meta", None)
-                if meta:
-                    progress_token = getattr(meta, "progressToken", None)
-
-            # Create progress callback for MCP
-            async def send_progress(current_step: int, total_steps: int):
-                if progress_token:
-                    try:
-                        # Send progress notification to client
-                        await app.request_context.session.send_progress_notification(
-                            progress_token=progress_token,
-                            progress=current_step,
-                            total=total_steps,
-                        )
-                        logger.debug(f"Progress: {current_step}/{total_steps}")
-                    except Exception as e:
-                        logger.warning(f"Failed to send progress notification: {e}")
-
-            # Wrapper to make async callback work with sync generator
-            def progress_wrapper(current_step: int, total_steps: int):
-                import asyncio
-
-                try:
-                    # Get or create event loop
-                    loop = asyncio.get_event_loop()
-                    if loop.is_running():
-                        # We're in an async context, create a task
-                        asyncio.create_task(send_progress(current_step, total_steps))
-                    else:
-                        # Run the coroutine
-                        loop.run_until_complete(send_progress(current_step, total_steps))
-                except Exception as e:
-                    logger.debug(f"Could not send progress: {e}")
-
-            # Generate image with progress reporting
-            logger.info(f"Generating image with {model}: {prompt[:50]}...")
-            output_path, used_seed, settings, pil_image, image_id = generator.generate(
-                prompt=prompt,
-                model=model,
-                steps=steps,
-                guidance_scale=guidance_scale,
-                width=width,
-                height=height,
-                seed=seed,
-                progress_callback=progress_wrapper if progress_token else None,
-            )
-
-            # Create thumbnail (512x512) for instant preview
-            thumbnail_size = (512, 512)
-            thumbnail = pil_image.copy()
-            thumbnail.thumbnail(thumbnail_size, Image.Resampling.LANCZOS)
-
-            # Save thumbnail to disk
-            thumb_filename = output_path.stem + "_thumb" + output_path.suffix
-            thumb_path = output_path.parent / thumb_filename
-            thumbnail.save(thumb_path)
-
-            # Encode thumbnail as base64 for instant preview
-            buffer = io.BytesIO()
-            thumbnail.save(buffer, format="PNG")
-            thumbnail_data = base64.b64encode(buffer.getvalue()).decode("utf-8")
+@app.list_tools()
+async def list_tools() -> list[Tool]:
+    """List available tools."""
+    return _TOOLS
+
+
+def _preview_link(thumb_path: Path) -> ResourceLink:
+    """Reference a thumbnail by file URI instead of inlining it as base64."""
+    return ResourceLink(
+        type="resource_link",
+        uri=thumb_path.resolve().as_uri(),
+        name=thumb_path.name,
+        mimeType="image/png",
+    )
+
+
+def _write_thumbnail(output_path: Path, pil_image: Image.Image) -> str | None:
+    """Write the preview thumbnail next to ``output_path``.
+
+    Runs in a worker thread. Returns the base64 PNG for an inline preview, or
+    None when previews are sent as links.
+    """
+    thumbnail = _make_thumbnail(pil_image, _THUMBNAIL_SIZE)
+    thumb_path = _thumbnail_path(output_path)
+
+    # Encode the thumbnail once; the same PNG bytes go to disk and inline preview.
+    # The shared buffer is rewound and truncated after writing (not before), so
+    # it keeps its allocation across similarly sized thumbnails.
+    global _PNG_BUF
+    with _PNG_BUF_LOCK:
+        _PNG_BUF.seek(0)
+        thumbnail.save(_PNG_BUF, format="PNG", optimize=False, compress_level=1)
+        _PNG_BUF.truncate()
+        # Zero-copy view of the encoded PNG; released before the buffer is reused
+        with _PNG_BUF.getbuffer() as png_bytes:
+            if config.preview_as_link:
+                thumb_path.write_bytes(png_bytes)
+                return None
+            # Disk write and base64 encode are independent: overlap them on the
+            # generator's I/O pool. Wait for both before raising, so no thread
+            # still reads the view when it is released.
+            write_future = generator._io_pool.submit(thumb_path.write_bytes, png_bytes)
+            try:
+                thumbnail_data = b64encode_as_string(png_bytes)
+                write_future.result()
+            except BaseException:
+                write_future.exception()  # Blocks until the write has finished
+                # The error's traceback can keep the view exported until it is
+                # collected; give the next call a fresh buffer instead of the pinned one
+                _PNG_BUF = io.BytesIO()
+                raise
+            return thumbnail_data
+
+
+async def _handle_generate(arguments: Any) -> list[TextContent | ImageContent | ResourceLink]:
+    """Generate an image and return its details plus an inline thumbnail."""
+    # Extract parameters
+    prompt = arguments["prompt"]
+    # Unset model/steps/guidance fall through to FLUX_MODEL_ID and the model's own defaults
+    model = arguments.get("model")
+    steps = arguments.get("steps")
+    guidance_scale = arguments.get("guidance_scale")
+    width = arguments.get("width", 1024)
+    height = arguments.get("height", 1024)
+    seed = arguments.get("seed")
+
+    # Validate parameters
+    if not prompt or prompt.isspace():
+        return [TextContent(type="text", text="Error: Prompt cannot be empty")]
+
+    values = {"steps": steps, "width": width, "height": height}
+    for field, low, high in _BOUNDS:
+        if values[field] is not None and not low <= values[field] <= high:
+            return [
+                TextContent(
+                    type="text",
+                    text=f"Error: {field.capitalize()} must be between {low} and {high}",
+                )
+            ]
 
-            # Format response
-            response = f"""Image generated successfully!
+    # Get progress token if provided (batched operations report no progress)
+    progress_token = None
+    if not _IN_BATCH.get() and hasattr(app, "request_context") and app.request_context:
+        meta = getattr(app.request_context, "meta", None)
+        if meta:
+            progress_token = getattr(meta, "progressToken", None)
+
+    # Create progress callback for MCP
+    async def send_progress(current_step: int, total_steps: int):
+        if progress_token:
+            try:
+                # Send progress notification to client
+                await app.request_context.session.send_progress_notification(
+                    progress_token=progress_token,
+                    progress=current_step,
+                    total=total_steps,
+                )
+                logger.debug(f"Progress: {current_step}/{total_steps}")
+            except Exception as e:
+                logger.warning(f"Failed to send progress notification: {e}")
+
+    # The generator runs in a worker thread: each step only hands its (step, total)
+    # to the event loop, where a single-slot queue keeps the latest update and a
+    # drain task sends at most one notification per interval
+    loop = asyncio.get_running_loop()
+    progress_queue: asyncio.Queue[tuple[int, int]] = asyncio.Queue(maxsize=1)
+
+    def offer_progress(update: tuple[int, int]):
+        if progress_queue.full():
+            progress_queue.get_nowait()  # Superseded by the newer step
+        progress_queue.put_nowait(update)
+
+    def progress_wrapper(current_step: int, total_steps: int):
+        loop.call_soon_threadsafe(offer_progress, (current_step, total_steps))
+
+    async def drain_progress():
+        while True:
+            current_step, total_steps = await progress_queue.get()
+            await send_progress(current_step, total_steps)
+            if current_step >= total_steps:
+                return
+            await asyncio.sleep(_PROGRESS_INTERVAL_SECONDS)
+
+    drain_task = asyncio.create_task(drain_progress()) if progress_token else None
+
+    def generate_with_thumbnail():
+        result = generator.generate(
+            prompt=prompt,
+            model=model,
+            steps=steps,
+            guidance_scale=guidance_scale,
+            width=width,
+            height=height,
+            seed=seed,
+            progress_callback=progress_wrapper if progress_token else None,
+        )
+        # Still in the worker: a cancelled call leaves the thumbnail on disk
+        return result, _write_thumbnail(result[0], result[3])
+
+    # Generate image and thumbnail with progress reporting, off the event loop
+    logger.info(f"Generating image with {model or config.model_id}: {prompt[:50]}...")
+    try:
+        result, thumbnail_data = await asyncio.to_thread(generate_with_thumbnail)
+    except BaseException:
+        if drain_task is not None:
+            drain_task.cancel()
+        raise
+    if drain_task is not None:
+        try:
+            # Give the final step a moment to go out, but never wait on a stalled client
+            await asyncio.wait({drain_task}, timeout=_PROGRESS_INTERVAL_SECONDS * 2)
+        finally:
+            drain_task.cancel()
+    output_path, used_seed, settings, _, image_id = result
+
+    thumb_path = _thumbnail_path(output_path)
+    if thumbnail_data is None:
+        preview = _preview_link(thumb_path)
+    else:
+        preview = ImageContent(type="image", data=thumbnail_data, mimeType="image/png")
+
+    # The full-size PNG is written in the background; surface any write error
+    # (full disk, permissions) before reporting success
+    await asyncio.to_thread(generator.wait_for_save, output_path)
+
+    # Format response
+    response = f"""Image generated successfully!
 
 📁 Full-size image: {output_path}
 🖼️  Thumbnail: {thumb_path}
@@ -260,116 +408,165 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageConten
 
 💡 Use the same seed to reproduce this image.
 💡 Use image ID with get_preview to retrieve this image later.
-📌 A {thumbnail_size[0]}x{thumbnail_size[1]} thumbnail is shown below for instant preview.
+📌 A {_THUMBNAIL_SIZE}x{_THUMBNAIL_SIZE} thumbnail is shown below for instant preview.
 """
-            return [
-                TextContent(type="text", text=response),
-                ImageContent(type="image", data=thumbnail_data, mimeType="image/png"),
-            ]
+    return [TextContent(type="text", text=response), preview]
 
-        elif name == "unload_model":
-            generator.unload_model()
-            return [
-                TextContent(
-                    type="text",
-                    text="✅ FLUX model unloaded successfully. GPU memory freed.",
-                )
-            ]
 
-        elif name == "get_status":
-            status = generator.get_status()
+async def _handle_unload(arguments: Any) -> list[TextContent | ImageContent | ResourceLink]:
+    """Unload the model and free GPU memory."""
+    # Waits for any running generation to release the lock; keep the event loop free
+    await asyncio.to_thread(generator.unload_model)
+    return [
+        TextContent(
+            type="text",
+            text="✅ FLUX model unloaded successfully. GPU memory freed.",
+        )
+    ]
+
 
-            # Format status message
-            if status["model_loaded"]:
-                status_msg = f"""🟢 FLUX Model Status: LOADED
+async def _handle_status(arguments: Any) -> list[TextContent | ImageContent | ResourceLink]:
+    """Report model, auto-unload and memory status."""
+    status = await asyncio.to_thread(generator.get_status)
 
-🎨 Current model: {status["current_model"]}
-⏱️  Time until auto-unload: {status["time_until_unload"]}
-⚙️  Auto-unload timeout: {status["timeout_seconds"]}s
-📅 Last access: {status["last_access"]}
-"""
-                if status["vram_usage"]:
-                    vram = status["vram_usage"]
-                    status_msg += f"""
-🎮 VRAM Usage:
-  - Allocated: {vram["allocated_gb"]} GB
-  - Reserved: {vram["reserved_gb"]} GB
-"""
-            else:
-                status_msg = f"""🔴 FLUX Model Status: NOT LOADED
+    # Format status message
+    template = _STATUS_LOADED_TMPL if status["model_loaded"] else _STATUS_UNLOADED_TMPL
+    status_msg = template % status
+    if status["vram_usage"]:
+        status_msg += _VRAM_TMPL % status["vram_usage"]
 
-⚙️  Auto-unload timeout: {status["timeout_seconds"]}s
-💡 Model will load automatically on next generation request.
-"""
-                if status["vram_usage"]:
-                    vram = status["vram_usage"]
-                    status_msg += f"""
-🎮 VRAM Usage:
-  - Allocated: {vram["allocated_gb"]} GB
-  - Reserved: {vram["reserved_gb"]} GB
-"""
+    return [TextContent(type="text", text=status_msg)]
 
-            return [TextContent(type="text", text=status_msg)]
 
-        elif name == "get_preview":
-            image_id = arguments.get("image_id")
-            result = generator.get_preview(image_id)
+async def _handle_preview(arguments: Any) -> list[TextContent | ImageContent | ResourceLink]:
+    """Return the thumbnail and path of a generated image."""
+    image_id = arguments.get("image_id")
+    # May block on a pending background save
+    result = await asyncio.to_thread(generator.get_preview, image_id)
 
-            if result is None:
-                msg = "No image found."
-                if image_id:
-                    msg = f"No image found with ID '{image_id}'."
-                elif generator._last_image_id is None:
-                    msg = "No images have been generated yet in this session."
-                return [TextContent(type="text", text=msg)]
+    if result is None:
+        msg = "No image found."
+        if image_id:
+            msg = f"No image found with ID '{image_id}'."
+        elif generator._last_image_id is None:
+            msg = "No images have been generated yet in this session."
+        return [TextContent(type="text", text=msg)]
 
-            full_path, thumb_path = result
+    full_path, thumb_path = result
 
-            # Load thumbnail and encode as base64
-            with Image.open(thumb_path) as thumb_img:
-                buffer = io.BytesIO()
-                thumb_img.save(buffer, format="PNG")
-                thumbnail_data = base64.b64encode(buffer.getvalue()).decode("utf-8")
-                thumb_size = thumb_img.size
+    # Opening a PNG only parses its header, which is all the size needs
+    if config.preview_as_link:
+        with Image.open(thumb_path) as thumb_img:
+            thumb_size = thumb_img.size
+        preview = _preview_link(thumb_path)
+    else:
+        # The thumbnail is already a PNG: send its bytes as-is
+        png_bytes = thumb_path.read_bytes()
+        with Image.open(io.BytesIO(png_bytes)) as thumb_img:
+            thumb_size = thumb_img.size
+        thumbnail_data = b64encode_as_string(png_bytes)
+        preview = ImageContent(type="image", data=thumbnail_data, mimeType="image/png")
 
-            response = f"""Preview retrieved successfully!
+    response = f"""Preview retrieved successfully!
 
 📁 Full-size image: {full_path}
 🖼️  Thumbnail: {thumb_path}
 🆔 Image ID: {full_path.stem}
 📐 Thumbnail size: {thumb_size[0]}x{thumb_size[1]}
 """
-            return [
-                TextContent(type="text", text=response),
-                ImageContent(type="image", data=thumbnail_data, mimeType="image/png"),
-            ]
+    return [TextContent(type="text", text=response), preview]
 
-        elif name == "set_timeout":
-            timeout_seconds = arguments["timeout_seconds"]
 
-            if timeout_seconds < 0:
-                return [
-                    TextContent(
-                        type="text",
-                        text="Error: Timeout must be non-negative (0 to disable)",
-                    )
-                ]
+async def _handle_set_timeout(arguments: Any) -> list[TextContent | ImageContent | ResourceLink]:
+    """Update the auto-unload timeout."""
+    timeout_seconds = arguments["timeout_seconds"]
 
-            config.update_timeout(timeout_seconds)
+    if timeout_seconds < 0:
+        return [
+            TextContent(
+                type="text",
+                text="Error: Timeout must be non-negative (0 to disable)",
+            )
+        ]
+
+    config.update_timeout(timeout_seconds)
+
+    if timeout_seconds == 0:
+        msg = "✅ Auto-unload disabled. Model will stay loaded until manually unloaded."
+    else:
+        msg = f"✅ Auto-unload timeout set to {timeout_seconds} seconds."
+
+    return [TextContent(type="text", text=msg)]
+
+
+async def _handle_batch(arguments: Any) -> list[TextContent | ImageContent | ResourceLink]:
+    """Run several tool calls concurrently and return their results in order."""
+    operations = arguments["operations"]
+    max_concurrent = arguments.get("maxConcurrent", 4)
+    if max_concurrent < 1:
+        return [TextContent(type="text", text="Error: maxConcurrent must be at least 1")]
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    def operation_name(operation: Any) -> str | None:
+        name = operation.get("name") if isinstance(operation, dict) else None
+        return name if isinstance(name, str) else None
+
+    async def run(operation: Any) -> list[TextContent | ImageContent | ResourceLink]:
+        # A malformed operation reports its own error instead of failing the batch
+        name = operation_name(operation)
+        if name is None:
+            return [TextContent(type="text", text="Error: Operation needs a string 'name'")]
+        if name == "batch_execute":
+            return [TextContent(type="text", text="Error: batch_execute cannot be nested")]
+        tool_arguments = operation.get("arguments") or {}
+        if not isinstance(tool_arguments, dict):
+            return [TextContent(type="text", text="Error: Operation 'arguments' must be an object")]
+        async with semaphore:
+            return await _dispatch(name, tool_arguments)
+
+    # The operation tasks copy the current context, so they all see the flag
+    in_batch = _IN_BATCH.set(True)
+    try:
+        results = await asyncio.gather(*(run(operation) for operation in operations))
+    finally:
+        _IN_BATCH.reset(in_batch)
+
+    contents: list[TextContent | ImageContent | ResourceLink] = []
+    for index, (operation, result) in enumerate(zip(operations, results, strict=True), 1):
+        name = operation_name(operation) or "<invalid>"
+        header = f"── [{index}/{len(operations)}] {name} ──"
+        contents.append(TextContent(type="text", text=header))
+        contents.extend(result)
+    return contents
+
+
+async def _dispatch(name: str, arguments: Any) -> list[TextContent | ImageContent | ResourceLink]:
+    """Run the handler for a tool, turning errors into an error message."""
+    handler = _DISPATCH.get(name)
+    if handler is None:
+        return [TextContent(type="text", text=f"Error: Unknown tool '{name}'")]
+    try:
+        return await handler(arguments)
+    except Exception as e:
+        logger.error(f"Error in tool '{name}': {e}", exc_info=True)
+        return [TextContent(type="text", text=f"Error: {str(e)}")]
 
-            if timeout_seconds == 0:
-                msg = "✅ Auto-unload disabled. Model will stay loaded until manually unloaded."
-            else:
-                msg = f"✅ Auto-unload timeout set to {timeout_seconds} seconds."
 
-            return [TextContent(type="text", text=msg)]
+# Tool name -> handler coroutine
+_DISPATCH = {
+    "generate_image": _handle_generate,
+    "unload_model": _handle_unload,
+    "get_status": _handle_status,
+    "get_preview": _handle_preview,
+    "set_timeout": _handle_set_timeout,
+    "batch_execute": _handle_batch,
+}
 
-        else:
-            return [TextContent(type="text", text=f"Error: Unknown tool '{name}'")]
 
-    except Exception as e:
-        logger.error(f"Error in tool '{name}': {e}", exc_info=True)
-        return [TextContent(type="text", text=f"Error: {str(e)}")]
+@app.call_tool()
+async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageContent | ResourceLink]:
+    """Handle tool calls."""
+    return await _dispatch(name, arguments)
 
 
 async def async_main():
@@ -384,8 +581,6 @@ async def async_main():
 
 def main():
     """Entry point for the MCP server."""
-    import asyncio
-
     asyncio.run(async_main())
 
 
@@ -0,0 +1,77 @@
+"""Tests for the flux CLI, run against a stub generator (no model or GPU needed)."""
+
+import sys
+import types
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from click.testing import CliRunner
+
+from flux_mcp.cli import cli
+from flux_mcp.config import config
+
+
+class _FakeThumbnail:
+    def save(self, path):
+        Path(path).write_bytes(b"thumbnail")
+
+
+class _FakeGenerator:
+    """Stands in for FluxGenerator: reports a loaded model and echoes the seed back."""
+
+    def __init__(self, auto_unload=True):
+        self.pipeline = object()
+        self.calls = []
+
+    def generate(self, **kwargs):
+        self.calls.append(kwargs)
+        seed = kwargs["seed"] if kwargs["seed"] is not None else 1234
+        output_path = kwargs["output_path"] or config.output_dir / f"image_{seed}.png"
+        settings = {"generation_time": "1.00s"}
+        return output_path, seed, settings, object(), output_path.stem
+
+    def wait_for_save(self, path):
+        pass
+
+
+@pytest.fixture
+def runner(monkeypatch, tmp_path):
+    """CliRunner with torch and flux_mcp.generator replaced by stubs."""
+    torch = mock.MagicMock()
+    torch.cuda.is_available.return_value = False
+    torch.backends.mps.is_available.return_value = False
+    torch.cuda.OutOfMemoryError = type("OutOfMemoryError", (RuntimeError,), {})
+    monkeypatch.setitem(sys.modules, "torch", torch)
+
+    generator_module = types.ModuleType("flux_mcp.generator")
+    generator_module.FluxGenerator = _FakeGenerator
+    generator_module._make_thumbnail = lambda image, max_size=512: _FakeThumbnail()
+    generator_module._thumbnail_path = lambda path: path.with_name(f"{path.stem}_thumb.png")
+    monkeypatch.setitem(sys.modules, "flux_mcp.generator", generator_module)
+
+    monkeypatch.setattr(config, "output_dir", tmp_path)
+    return CliRunner()
+
+
+def test_generate_reports_seed_zero(runner):
+    result = runner.invoke(cli, ["generate", "a red fox", "--seed", "0"])
+
+    assert result.exit_code == 0, result.output
+    assert "Seed: 0" in result.output
+    assert "--seed 0" in result.output
+
+
+def test_generate_verbose_echoes_seed_zero(runner):
+    result = runner.invoke(cli, ["generate", "a red fox", "--seed", "0", "--verbose"])
+
+    assert result.exit_code == 0, result.output
+    # Once in the request summary, once in the result
+    assert result.output.count("Seed: 0") == 2
+
+
+def test_generate_requires_prompt(runner):
+    result = runner.invoke(cli, ["generate"])
+
+    assert result.exit_code == 1
+    assert "Prompt is required" in result.output
@@ -0,0 +1,134 @@
+"""Tests for request coalescing in FluxGenerator, run against a stub pipeline."""
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+import torch
+from PIL import Image
+
+from flux_mcp.config import config
+from flux_mcp.generator import FluxGenerator, _GenerationRequest
+
+
+class _FakePipeline:
+    """Records each call and returns one blank image per prompt embedding."""
+
+    def __init__(self):
+        self.vae = SimpleNamespace()
+        self.calls = []
+
+    def __call__(self, *, prompt_embeds, num_inference_steps, width, height, **kwargs):
+        self.calls.append({"batch_size": prompt_embeds.shape[0], "width": width})
+        images = [Image.new("RGB", (width, height)) for _ in range(prompt_embeds.shape[0])]
+        return SimpleNamespace(images=images)
+
+
+@pytest.fixture
+def generator(monkeypatch, tmp_path):
+    """FluxGenerator whose model loading and prompt encoding are stubbed out."""
+    monkeypatch.setattr(config, "output_dir", tmp_path)
+    gen = FluxGenerator(auto_unload=False)
+    pipeline = _FakePipeline()
+
+    def load_model(model_id=None):
+        gen.pipeline = pipeline
+        gen._current_model_id = model_id or gen.model_id
+        gen._defaults = {"steps": 2, "guidance": 3.5}
+        gen._generator = torch.Generator()
+
+    monkeypatch.setattr(gen, "_load_model", load_model)
+    monkeypatch.setattr(gen, "_encode_prompt", lambda prompt: {"prompt_embeds": torch.zeros(1, 4)})
+    gen.fake_pipeline = pipeline
+    return gen
+
+
+def _request(**overrides) -> _GenerationRequest:
+    fields = {
+        "prompt": "a red fox",
+        "steps": 2,
+        "guidance_scale": 3.5,
+        "width": 256,
+        "height": 256,
+        "seed": 1,
+        "model_id": None,
+        "progress_callback": None,
+    }
+    fields.update(overrides)
+    return _GenerationRequest(**fields)
+
+
+def test_take_batch_groups_matching_requests(generator):
+    leader = _request()
+    match = _request(prompt="a grey wolf", seed=2)
+    other = _request(width=512)
+    generator._batch_queue = [leader, other, match]
+
+    assert generator._take_batch(leader) == [leader, match]
+    assert generator._batch_queue == [other]
+
+
+def test_take_batch_respects_max_batch_size(generator, monkeypatch):
+    monkeypatch.setattr(config, "max_batch_size", 2)
+    requests = [_request(seed=seed) for seed in range(3)]
+    generator._batch_queue = list(requests)
+
+    assert generator._take_batch(requests[0]) == requests[:2]
+    assert generator._batch_queue == requests[2:]
+
+
+def test_run_batch_stores_error_on_every_request(generator, monkeypatch):
+    error = RuntimeError("pipeline failed")
+
+    def fail(batch):
+        raise error
+
+    monkeypatch.setattr(generator, "_run_batch_locked", fail)
+    batch = [_request(seed=1), _request(seed=2)]
+    generator._run_batch(batch)
+
+    assert all(request.done for request in batch)
+    assert all(request.error is error for request in batch)
+
+
+def test_concurrent_requests_share_one_pipeline_call(generator, monkeypatch):
+    monkeypatch.setattr(config, "batch_window_ms", 200)
+
+    def generate(seed):
+        output_path, used_seed, *_ = generator.generate(
+            "a red fox", width=256, height=256, seed=seed
+        )
+        generator.wait_for_save(output_path)
+        return used_seed
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        seeds = list(pool.map(generate, [1, 2]))
+
+    assert seeds == [1, 2]
+    assert generator.fake_pipeline.calls == [{"batch_size": 2, "width": 256}]
+
+
+def test_mismatched_requests_run_separately(generator, monkeypatch):
+    monkeypatch.setattr(config, "batch_window_ms", 200)
+
+    def generate(width):
+        output_path, *_ = generator.generate("a red fox", width=width, height=256, seed=width)
+        generator.wait_for_save(output_path)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(generate, [256, 512]))
+
+    assert sorted(call["width"] for call in generator.fake_pipeline.calls) == [256, 512]
+    assert all(call["batch_size"] == 1 for call in generator.fake_pipeline.calls)
+
+
+def test_generate_reraises_pipeline_error(generator, monkeypatch):
+    monkeypatch.setattr(config, "batch_window_ms", 0)
+
+    def fail(self, **kwargs):
+        raise RuntimeError("pipeline failed")
+
+    monkeypatch.setattr(_FakePipeline, "__call__", fail)
+
+    with pytest.raises(RuntimeError, match="pipeline failed"):
+        generator.generate("a red fox", width=256, height=256, seed=1)
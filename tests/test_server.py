@@ -0,0 +1,86 @@
+"""Tests for the batch_execute tool, run against stub tool handlers."""
+
+import asyncio
+
+import pytest
+
+from flux_mcp import server
+
+
+def _texts(contents) -> list[str]:
+    return [content.text for content in contents]
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    """Replace the real tool handlers with stubs that record whether they ran in a batch."""
+    in_batch = []
+
+    async def echo(arguments):
+        in_batch.append(server._IN_BATCH.get())
+        return [server.TextContent(type="text", text=f"echo {arguments.get('value')}")]
+
+    async def fail(arguments):
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(server._DISPATCH, "echo", echo)
+    monkeypatch.setitem(server._DISPATCH, "fail", fail)
+    return in_batch
+
+
+def test_batch_returns_results_in_order(handlers):
+    operations = [
+        {"name": "echo", "arguments": {"value": 1}},
+        {"name": "echo", "arguments": {"value": 2}},
+    ]
+    contents = asyncio.run(server._handle_batch({"operations": operations}))
+
+    assert _texts(contents) == [
+        "── [1/2] echo ──",
+        "echo 1",
+        "── [2/2] echo ──",
+        "echo 2",
+    ]
+
+
+def test_failing_operation_does_not_abort_batch(handlers):
+    operations = [{"name": "fail"}, {"name": "echo", "arguments": {"value": 1}}]
+    contents = asyncio.run(server._handle_batch({"operations": operations}))
+
+    assert _texts(contents) == [
+        "── [1/2] fail ──",
+        "Error: boom",
+        "── [2/2] echo ──",
+        "echo 1",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("operation", "error"),
+    [
+        ({"arguments": {}}, "Error: Operation needs a string 'name'"),
+        ("echo", "Error: Operation needs a string 'name'"),
+        ({"name": "batch_execute"}, "Error: batch_execute cannot be nested"),
+        ({"name": "echo", "arguments": [1]}, "Error: Operation 'arguments' must be an object"),
+        ({"name": "missing"}, "Error: Unknown tool 'missing'"),
+    ],
+)
+def test_malformed_operation_reports_its_own_error(handlers, operation, error):
+    operations = [operation, {"name": "echo", "arguments": {"value": 1}}]
+    contents = asyncio.run(server._handle_batch({"operations": operations}))
+
+    assert _texts(contents)[1] == error
+    assert _texts(contents)[3] == "echo 1"
+
+
+def test_operations_run_with_progress_disabled(handlers):
+    asyncio.run(server._handle_batch({"operations": [{"name": "echo"}, {"name": "echo"}]}))
+
+    assert handlers == [True, True]
+    assert server._IN_BATCH.get() is False
+
+
+def test_batch_rejects_zero_concurrency(handlers):
+    contents = asyncio.run(server._handle_batch({"operations": [], "maxConcurrent": 0}))
+
+    assert _texts(contents) == ["Error: maxConcurrent must be at least 1"]